@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the test case generator
+
+Runs each scenario in fresh interpreters and reports the median wall time and
+which heavy dependencies were loaded. Compare two revisions with:
+
+    python bench_import_time.py                 # current tree
+    git stash && python bench_import_time.py && git stash pop
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Dependencies worth loading only when they are actually used
+HEAVY_MODULES = ["pandas", "numpy", "requests", "httpx", "openpyxl", "pyarrow", "google.generativeai"]
+
+SCENARIOS = {
+    "import TestCaseData": "from test_case_generator import TestCaseData",
+    "create Ollama generator": "from test_case_generator import TestCaseGenerator; TestCaseGenerator('ollama')",
+    "CLI --help": "import sys; sys.argv = ['test_case_generator.py', '--help']\n"
+                  "import test_case_generator\n"
+                  "try:\n    test_case_generator.main()\nexcept SystemExit:\n    pass",
+}
+
+PROBE = """
+import io, sys, time, json, contextlib
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    exec({code!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def run_scenario(code: str, runs: int) -> dict:
+    """Run code in `runs` fresh interpreters; median seconds and modules loaded"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    loaded = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(code=code, heavy=HEAVY_MODULES)],
+            cwd=here, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["elapsed"])
+        loaded = result["loaded"]
+    return {"median": statistics.median(times), "min": min(times), "loaded": loaded}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup time of the test case generator")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per scenario (default 5)")
+    args = parser.parse_args()
+
+    print(f"⏱️ Import-time benchmark ({args.runs} runs per scenario)")
+    print("=" * 60)
+    for name, code in SCENARIOS.items():
+        result = run_scenario(code, args.runs)
+        loaded = ", ".join(result["loaded"]) or "none"
+        print(f"{name:<26} median {result['median'] * 1000:7.0f} ms   (min {result['min'] * 1000:.0f} ms)")
+        print(f"{'':<26} heavy modules loaded: {loaded}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from history_manager import TestCaseHistory
+from excel_writer import StreamingExcelWriter
+from output_writers import format_for_path, get_output_format, write_output
+
+@dataclass
+class ConsolidationResult:
+    """Summary of a consolidated export"""
+    output_path: str
+    tickets: int = 0
+    rows: int = 0
+    duplicates: int = 0  # rows dropped because their Test Key was already written
+    skipped: List[str] = field(default_factory=list)  # "TICKET: reason" for files that couldn't be read
+
+# (history entry, columns, rows, error) for one generated file
+_FileRead = Tuple[Dict, Optional[List[str]], Optional[List[Dict]], Optional[Exception]]
+
+def _read_file(path: str) -> Tuple[List[str], List[Dict]]:
+    output_format = format_for_path(path)
+    if output_format.read is None:
+        raise ValueError(f"Can't read {output_format.label} files")
+    return output_format.read(path)
+
+def _read_files(entries: List[Dict], jobs: int) -> Iterator[_FileRead]:
+    """Read each entry's file in worker processes, yielding results in entry order
+
+    Parsing workbooks is CPU-bound, hence processes rather than threads. At
+    most 2 * jobs files are read ahead of the consumer, so memory use is
+    bounded by a few workbooks however many entries there are.
+    """
+    jobs = max(1, jobs)
+    entries = iter(entries)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        def submit():
+            entry = next(entries, None)
+            if entry is not None:
+                pending.append((entry, executor.submit(_read_file, entry.get('file_path') or '')))
+
+        for _ in range(2 * jobs):
+            submit()
+        while pending:
+            entry, future = pending.popleft()
+            submit()
+            try:
+                columns, rows = future.result()
+                yield entry, columns, rows, None
+            except Exception as e:
+                yield entry, None, None, e
+
+def consolidate(output_path: str, history: Optional[TestCaseHistory] = None, by_component: bool = False,
+                component: Optional[str] = None, date_from: Optional[datetime] = None,
+                date_to: Optional[datetime] = None, jobs: int = 4,
+                format_name: Optional[str] = None) -> ConsolidationResult:
+    """Merge the latest generated file of every ticket in history into one output
+
+    Only each ticket's most recent generation is used (optionally limited to a
+    component and created date range). Rows are streamed from files read in
+    parallel straight into the output, and rows whose Test Key was already
+    written (e.g. template rows repeated in every file) are dropped. With
+    by_component the output is a workbook with one sheet per component;
+    otherwise a single sheet in format_name or the output path's format.
+    """
+    output_format = get_output_format(format_name) if format_name else format_for_path(output_path)
+    if by_component and output_format.name != "xlsx":
+        raise ValueError("One sheet per component needs xlsx output")
+
+    history = history or TestCaseHistory()
+    entries = history.get_latest_entries(component, date_from, date_to)
+    result = ConsolidationResult(output_path)
+
+    # The first readable file decides the columns
+    reads = _read_files(entries, jobs)
+    first = None
+    for read in reads:
+        if read[3] is None:
+            first = read
+            break
+        result.skipped.append(f"{read[0].get('jira_ticket')}: {read[3]}")
+    if first is None:
+        raise RuntimeError("No generated files found to consolidate")
+    columns = first[1]
+
+    def rows() -> Iterator[Tuple[str, Dict]]:
+        seen = set()
+        for entry, _, file_rows, error in itertools.chain([first], reads):
+            if error is not None:
+                result.skipped.append(f"{entry.get('jira_ticket')}: {error}")
+                continue
+            result.tickets += 1
+            sheet = (entry.get('component') or "Unknown") if by_component else ""
+            for row in file_rows:
+                key = (sheet, row.get('Test Key') or tuple(str(row.get(c)) for c in columns))
+                if key in seen:
+                    result.duplicates += 1
+                    continue
+                seen.add(key)
+                yield sheet, row
+
+    if by_component:
+        with StreamingExcelWriter(output_path, columns) as writer:
+            for sheet, row in rows():
+                writer.write_row(row, sheet)
+        result.rows = writer.rows_written
+    else:
+        result.rows = write_output(output_path, columns, (row for _, row in rows()),
+                                   format_name=output_format.name)
+    return result
@@ -0,0 +1,85 @@
+import re
+import math
+import textwrap
+from dataclasses import dataclass, field
+from typing import List
+
+# "- item", "* item", "• item", "1. step", "2) step"
+_BULLET = re.compile(r"^(?:[-*•]|\d+[.)])\s+")
+_NUMBERED = re.compile(r"^\d+[.)]\s+")
+# "Core Requirements:" or "## Core Requirements"
+_HEADING = re.compile(r"^(?:#+\s*(.+?)|([^-*•\d\s][^:]{0,80}):)$")
+_NAVIGATION_WORDS = ("navigation", "navigate", "steps", "user flow", "workflow")
+
+@dataclass
+class _Group:
+    heading: str = ""
+    lines: List[str] = field(default_factory=list)
+    bullets: int = 0
+
+    @property
+    def is_navigation(self) -> bool:
+        """Numbered steps, or a heading that names a flow ("Navigation Steps:")"""
+        if any(word in self.heading.lower() for word in _NAVIGATION_WORDS):
+            return True
+        return bool(self.lines) and all(_NUMBERED.match(line) for line in self.lines)
+
+    def render(self, lines: List[str]) -> str:
+        return "\n".join(([f"{self.heading}:"] if self.heading else []) + lines)
+
+def _parse_groups(criteria: str) -> List[_Group]:
+    """Group lines under their headings; without headings, bullets and paragraphs form groups"""
+    groups: List[_Group] = []
+    paragraph_break = True
+    for raw in textwrap.dedent(criteria).strip().splitlines():
+        line = raw.strip()
+        if not line:
+            paragraph_break = True
+            continue
+        heading = _HEADING.match(line)
+        if heading:
+            groups.append(_Group(heading.group(1) or heading.group(2)))
+        elif _BULLET.match(line):
+            if not groups or (paragraph_break and not groups[-1].heading and not groups[-1].bullets):
+                groups.append(_Group())
+            groups[-1].lines.append(line)
+            groups[-1].bullets += 1
+        elif groups and groups[-1].bullets and not paragraph_break:
+            # Wrapped continuation of the previous bullet
+            groups[-1].lines[-1] += " " + line
+        else:
+            if not groups or (paragraph_break and not groups[-1].heading) or groups[-1].bullets:
+                groups.append(_Group())
+            groups[-1].lines.append(line)
+        paragraph_break = False
+    return groups
+
+def split_into_sections(criteria: str, max_items: int = 8) -> List[str]:
+    """Split acceptance criteria into parts that can be tested independently
+
+    Sections are requirement groups under a heading ("Core Requirements:"),
+    navigation steps, or runs of bullets and paragraphs; a group with more
+    than max_items bullets is split into even chunks. Headings without items
+    (the feature title) and any navigation steps are repeated in every other
+    section as context. Returns [criteria] when there is nothing to split.
+    """
+    groups = _parse_groups(criteria)
+    titles = [g.heading for g in groups if not g.lines]
+    groups = [g for g in groups if g.lines]
+    navigation = [g for g in groups if g.is_navigation]
+
+    sections = []
+    for group in groups:
+        chunks = [group.lines]
+        if not group.is_navigation and group.bullets > max_items:
+            size = math.ceil(len(group.lines) / math.ceil(len(group.lines) / max_items))
+            chunks = [group.lines[i:i + size] for i in range(0, len(group.lines), size)]
+        for chunk in chunks:
+            parts = [f"{title}:" for title in titles] + [group.render(chunk)]
+            if group not in navigation:
+                parts += [nav.render(nav.lines) for nav in navigation]
+            sections.append("\n\n".join(parts))
+
+    if len(sections) < 2:
+        return [criteria.strip()]
+    return sections
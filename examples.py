@@ -31,17 +31,13 @@ def example_login_feature():
         test_type="Functional"
     )
     
-    # Initialize generator (try Groq first, fallback to Ollama)
+    # Initialize generator (route between Groq and Ollama, failing over if one is down)
     try:
-        generator = TestCaseGenerator("groq")
-        print("🚀 Using Groq AI provider")
-    except:
-        try:
-            generator = TestCaseGenerator("ollama")
-            print("🚀 Using Ollama AI provider")
-        except:
-            print("❌ No AI provider available. Please set up Groq or Ollama.")
-            return
+        generator = TestCaseGenerator("groq,ollama")
+        print("🚀 Using Groq/Ollama AI providers")
+    except ValueError:
+        print("❌ No AI provider available. Please set up Groq or Ollama.")
+        return
     
     # Generate test cases
     output_file = f"{test_data.jira_ticket}_example_testcases.xlsx"
@@ -82,15 +78,11 @@ def example_api_feature():
     )
     
     try:
-        generator = TestCaseGenerator("groq")
-        print("🚀 Using Groq AI provider")
-    except:
-        try:
-            generator = TestCaseGenerator("ollama")
-            print("🚀 Using Ollama AI provider")
-        except:
-            print("❌ No AI provider available. Please set up Groq or Ollama.")
-            return
+        generator = TestCaseGenerator("groq,ollama")
+        print("🚀 Using Groq/Ollama AI providers")
+    except ValueError:
+        print("❌ No AI provider available. Please set up Groq or Ollama.")
+        return
     
     output_file = f"{test_data.jira_ticket}_example_testcases.xlsx"
     success = generator.generate_from_template(
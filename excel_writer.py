@@ -0,0 +1,100 @@
+import re
+from typing import Dict, Iterable, List, Optional
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from output_writers import cell_value
+
+# Header style pandas' to_excel uses, so streamed workbooks look the same
+_HEADER_FONT = Font(bold=True)
+_HEADER_BORDER = Border(*(Side(style="thin"),) * 4)
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="top")
+
+def _sheet_title(name: str, taken: Iterable[str]) -> str:
+    """A valid, unique worksheet title for name (Excel allows 31 chars and no []:*?/\\)"""
+    base = re.sub(r'[\[\]:*?/\\]', '-', str(name)).strip("'") or "Sheet"
+    taken = {t.lower() for t in taken}
+    title, n = base[:31], 1
+    while title.lower() in taken:
+        n += 1
+        suffix = f" ({n})"
+        title = base[:31 - len(suffix)] + suffix
+    return title
+
+class StreamingExcelWriter:
+    """Write a workbook one row at a time in constant memory
+
+    Uses openpyxl's write-only mode: rows are serialized to a temporary file as
+    they are written instead of being held in a workbook or DataFrame, so memory
+    use stays flat however many rows are written. Rows are dicts keyed by column
+    name; missing keys become empty cells and unknown keys are ignored. Rows
+    go to sheet_name unless another sheet is named, so several sheets can be
+    filled in any order; each sheet is created with a header on first use.
+
+        with StreamingExcelWriter("out.xlsx", TEMPLATE_COLUMNS) as writer:
+            writer.write_rows(test_cases)
+    """
+
+    def __init__(self, output, columns: List[str], sheet_name: str = "Sheet1"):
+        self.output = output  # path or binary file-like object
+        self.columns = list(columns)
+        self.sheet_name = sheet_name
+        self.rows_written = 0
+        self._workbook = Workbook(write_only=True)
+        self._sheets: Dict[str, object] = {}
+        self._closed = False
+
+    def _sheet(self, name: str):
+        sheet = self._sheets.get(name)
+        if sheet is None:
+            title = _sheet_title(name, (s.title for s in self._sheets.values()))
+            sheet = self._sheets[name] = self._workbook.create_sheet(title)
+            self._write_header(sheet)
+        return sheet
+
+    def _write_header(self, sheet):
+        cells = []
+        for column in self.columns:
+            cell = WriteOnlyCell(sheet, value=column)
+            cell.font = _HEADER_FONT
+            cell.border = _HEADER_BORDER
+            cell.alignment = _HEADER_ALIGNMENT
+            cells.append(cell)
+        sheet.append(cells)
+
+    def write_row(self, row: Dict, sheet_name: Optional[str] = None):
+        self._sheet(sheet_name or self.sheet_name).append([cell_value(row.get(column)) for column in self.columns])
+        self.rows_written += 1
+
+    def write_rows(self, rows: Iterable[Dict], sheet_name: Optional[str] = None) -> int:
+        """Write rows from any iterable (e.g. a generator); returns how many were written"""
+        count = 0
+        for row in rows:
+            self.write_row(row, sheet_name)
+            count += 1
+        return count
+
+    def close(self):
+        """Finish the workbook and save it to the output"""
+        if not self._closed:
+            self._closed = True
+            # A workbook needs at least one sheet; write the header even without rows
+            if not self._sheets:
+                self._sheet(self.sheet_name)
+            self._workbook.save(self.output)
+
+    def __enter__(self) -> "StreamingExcelWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A failed write leaves no half-finished workbook behind
+        if exc_type is None:
+            self.close()
+
+def write_workbook(output, columns: List[str], *row_sources: Iterable[Dict],
+                   sheet_name: str = "Sheet1") -> int:
+    """Stream rows from one or more iterables into a new workbook; returns the row count"""
+    with StreamingExcelWriter(output, columns, sheet_name) as writer:
+        for rows in row_sources:
+            writer.write_rows(rows)
+        return writer.rows_written
@@ -1,48 +1,283 @@
 import os
+import re
 import json
-import pandas as pd
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional
+
+# Columns stored for each history entry, in insertion order
+ENTRY_COLUMNS = [
+    "jira_ticket", "priority", "acceptance_criteria", "file_path", "file_name",
+    "file_size", "provider", "component", "test_type", "created_date", "created_timestamp"
+]
+
+# Sort options for search(), mapped to entry columns
+SORT_COLUMNS = {
+    "created": "created_timestamp",
+    "jira_ticket": "jira_ticket",
+    "priority": "priority",
+    "provider": "provider",
+    "file_size": "file_size",
+}
+
+# Breakdowns kept in the stats table: dimension -> SQL expression over an entry row
+# ("{row}" is new or old in triggers)
+STATS_DIMENSIONS = {
+    "total": "'all'",
+    "provider": "COALESCE({row}.provider, 'unknown')",
+    "component": "COALESCE({row}.component, 'unknown')",
+    "day": "date({row}.created_timestamp, 'unixepoch', 'localtime')",
+}
+
+# Columns in the full-text index and their bm25 weights (a ticket id match ranks highest)
+SEARCH_COLUMNS = {"jira_ticket": 10.0, "acceptance_criteria": 1.0, "component": 2.0}
+
+def build_search_query(text: str) -> Optional[str]:
+    """Turn search box text into an FTS5 query
+
+    Quoted text is matched as a phrase and every other word as a prefix, all of
+    which must match (e.g. 'login "remember me"' -> '"login"* "remember me"').
+    Every token is quoted, so words like OR, NOT and AND are searched for
+    rather than read as FTS5 operators. Returns None if the text contains
+    nothing searchable.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        tokens = re.findall(r"\w+", phrase or word)
+        if not tokens:
+            continue
+        if phrase or len(tokens) > 1:
+            # Multi-token words such as PROJ-123 are matched as a phrase too
+            terms.append('"' + " ".join(tokens) + '"' + ("" if phrase else "*"))
+        else:
+            terms.append('"' + tokens[0] + '"*')
+    return " ".join(terms) or None
 
 class TestCaseHistory:
-    """Manages history of generated test cases"""
+    """Manages history of generated test cases
+
+    Entries live in a SQLite database (WAL mode, so readers never block the
+    writer) next to the legacy JSON history file. Existing JSON history is
+    imported once, the first time the database is opened. Every write is a
+    single transaction, so several processes can share the database and
+    readers never see a partial write.
+    """
     
-    def __init__(self, history_file="testcases/history.json"):
+    def __init__(self, history_file="testcases/history.json", db_file=None):
         self.history_file = history_file
+        self.db_file = db_file or os.getenv('HISTORY_DB_FILE') or os.path.splitext(history_file)[0] + ".db"
+        # Seconds a writer waits for another process's write lock before failing
+        self.busy_timeout = float(os.getenv('HISTORY_BUSY_TIMEOUT', '30'))
+        
+        # Group commit state (see batch())
+        self._pending: List[Dict] = []
+        self._pending_since = 0.0
+        self._pending_lock = threading.Lock()
+        self._batch_depth = 0
+        self._batch_max_entries = 100
+        self._batch_max_delay = 5.0
+        
         self.ensure_history_file_exists()
     
+    @contextmanager
+    def _connect(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        """Connection for one transaction: committed on success, rolled back on error, then closed
+
+        write=True takes the write lock up front (BEGIN IMMEDIATE) so a writer
+        waits for other processes instead of failing partway through.
+        """
+        conn = sqlite3.connect(self.db_file, timeout=self.busy_timeout)
+        conn.row_factory = sqlite3.Row
+        try:
+            if write:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
     def ensure_history_file_exists(self):
-        """Create history file if it doesn't exist"""
-        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+        """Create the history database if it doesn't exist and import legacy JSON history"""
+        db_dir = os.path.dirname(self.db_file)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    jira_ticket TEXT NOT NULL,
+                    priority TEXT,
+                    acceptance_criteria TEXT,
+                    file_path TEXT,
+                    file_name TEXT,
+                    file_size INTEGER DEFAULT 0,
+                    provider TEXT,
+                    component TEXT,
+                    test_type TEXT,
+                    created_date TEXT,
+                    created_timestamp REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_jira_ticket ON entries(jira_ticket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_provider ON entries(provider)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_created ON entries(created_timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_component ON entries(component)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_priority ON entries(priority)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._create_search_index(conn)
+            self._create_stats(conn)
+        self._migrate_json()
+    
+    def _create_search_index(self, conn: sqlite3.Connection):
+        """Create the FTS5 index over entries, kept in sync by triggers"""
+        columns = ", ".join(SEARCH_COLUMNS)
+        new_values = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+        old_values = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+                {columns}, content='entries', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+                INSERT INTO entries_fts (rowid, {columns}) VALUES (new.id, {new_values});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+                INSERT INTO entries_fts (entries_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE ON entries BEGIN
+                INSERT INTO entries_fts (entries_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO entries_fts (rowid, {columns}) VALUES (new.id, {new_values});
+            END
+        """)
+        # Index entries written before the search index existed
+        if not conn.execute("SELECT 1 FROM meta WHERE key = 'fts_built'").fetchone():
+            conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fts_built', '1')")
+    
+    def _create_stats(self, conn: sqlite3.Connection):
+        """Create the stats table, kept up to date by triggers on entries
+
+        Each row counts entries and bytes for one key of a breakdown (see
+        STATS_DIMENSIONS), so get_stats reads a handful of rows instead of
+        scanning the history.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stats (
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL,
+                entries INTEGER NOT NULL DEFAULT 0,
+                total_size INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, key)
+            )
+        """)
+        add = "\n".join(
+            f"INSERT INTO stats (dimension, key, entries, total_size) "
+            f"VALUES ('{dimension}', {expression.format(row='new')}, 1, COALESCE(new.file_size, 0)) "
+            f"ON CONFLICT (dimension, key) DO UPDATE SET entries = entries + 1, "
+            f"total_size = total_size + excluded.total_size;"
+            for dimension, expression in STATS_DIMENSIONS.items()
+        )
+        remove = "\n".join(
+            f"UPDATE stats SET entries = entries - 1, total_size = total_size - COALESCE(old.file_size, 0) "
+            f"WHERE dimension = '{dimension}' AND key = {expression.format(row='old')};"
+            for dimension, expression in STATS_DIMENSIONS.items()
+        ) + "\nDELETE FROM stats WHERE entries <= 0 AND dimension != 'total';"
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS entries_stats_insert AFTER INSERT ON entries BEGIN {add} END")
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS entries_stats_delete AFTER DELETE ON entries BEGIN {remove} END")
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS entries_stats_update AFTER UPDATE ON entries BEGIN {remove}\n{add} END")
+        
+        # Count entries written before the stats table existed
+        if not conn.execute("SELECT 1 FROM meta WHERE key = 'stats_built'").fetchone():
+            conn.execute("DELETE FROM stats")
+            for dimension, expression in STATS_DIMENSIONS.items():
+                conn.execute(f"""
+                    INSERT INTO stats (dimension, key, entries, total_size)
+                    SELECT '{dimension}', {expression.format(row='entries')}, COUNT(*), COALESCE(SUM(file_size), 0)
+                    FROM entries GROUP BY 2
+                """)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('stats_built', '1')")
+    
+    def _migrate_json(self):
+        """Import the legacy JSON history file once; the file itself is left untouched"""
         if not os.path.exists(self.history_file):
-            self.save_history([])
+            return
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return
+            # Take the write lock before re-checking so concurrent processes import only once
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return
+            try:
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    legacy = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                legacy = []
+            
+            # Keep old ids so references to them stay valid; ids duplicated by the
+            # old len+1 scheme get fresh ones
+            used = set()
+            for entry in legacy:
+                entry_id = entry.get('id')
+                if not isinstance(entry_id, int) or entry_id in used:
+                    entry_id = None
+                used.add(self._insert(conn, entry, entry_id))
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (datetime.now().isoformat(),))
+        if legacy:
+            print(f"📦 Imported {len(legacy)} history entries from {self.history_file} into {self.db_file}")
+    
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, entry: Dict, entry_id: int = None) -> int:
+        values = [entry.get(column) for column in ENTRY_COLUMNS]
+        cursor = conn.execute(
+            f"INSERT INTO entries (id, {', '.join(ENTRY_COLUMNS)}) VALUES (?{', ?' * len(ENTRY_COLUMNS)})",
+            [entry_id] + values
+        )
+        return cursor.lastrowid
     
     def load_history(self) -> List[Dict]:
-        """Load history from JSON file"""
-        try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        """Load all history entries in insertion order"""
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM entries ORDER BY id")]
     
     def save_history(self, history: List[Dict]):
-        """Save history to JSON file"""
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2, ensure_ascii=False)
+        """Replace all history entries atomically"""
+        with self._connect(write=True) as conn:
+            conn.execute("DELETE FROM entries")
+            for entry in history:
+                self._insert(conn, entry, entry.get('id'))
+            # The stored missing-file count no longer applies
+            conn.execute("DELETE FROM meta WHERE key IN ('missing_files', 'files_checked_at')")
     
-    def add_entry(self, jira_ticket: str, priority: str, acceptance_criteria: str, 
-                  file_path: str, provider: str, component: str = "Web Application", 
+    def add_entry(self, jira_ticket: str, priority: str, acceptance_criteria: str,
+                  file_path: str, provider: str, component: str = "Web Application",
                   test_type: str = "Functional"):
-        """Add a new entry to history"""
-        history = self.load_history()
-        
+        """Add a new entry to history
+
+        Inside a batch() block the entry is buffered and its "id" is set when
+        the batch is written.
+        """
         # Get file size
         file_size = 0
         if os.path.exists(file_path):
             file_size = os.path.getsize(file_path)
         
+        now = datetime.now()
         entry = {
-            "id": len(history) + 1,
+            "id": None,
             "jira_ticket": jira_ticket,
             "priority": priority,
             "acceptance_criteria": acceptance_criteria,
@@ -52,56 +287,254 @@ class TestCaseHistory:
             "provider": provider,
             "component": component,
             "test_type": test_type,
-            "created_date": datetime.now().isoformat(),
-            "created_timestamp": datetime.now().timestamp()
+            "created_date": now.isoformat(),
+            "created_timestamp": now.timestamp()
         }
         
-        history.append(entry)
-        self.save_history(history)
+        if self._buffer(entry):
+            return entry
+        with self._connect(write=True) as conn:
+            entry["id"] = self._insert(conn, entry)
         return entry
     
+    @contextmanager
+    def batch(self, max_entries: int = 100, max_delay: float = 5.0):
+        """Group commit: buffer add_entry calls and write them in one transaction
+
+        Buffered entries are written once max_entries are pending or the oldest
+        has waited max_delay seconds (checked on the next add_entry), and when
+        the outermost batch block exits. Safe to use from several threads. If
+        that last write fails (e.g. the database stays locked) a warning is
+        printed and the entries stay buffered for the next flush.
+        """
+        with self._pending_lock:
+            if not self._batch_depth:
+                self._batch_max_entries = max(1, max_entries)
+                self._batch_max_delay = max_delay
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._pending_lock:
+                self._batch_depth -= 1
+            # The batch's own work (e.g. generated files) is already done, so a
+            # failed write is reported rather than raised over its result
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"⚠️ Warning: Could not record history: {e}")
+    
+    def _buffer(self, entry: Dict) -> bool:
+        """Queue an entry if a batch is open, writing the batch when it is due"""
+        with self._pending_lock:
+            if not self._batch_depth:
+                return False
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append(entry)
+            due = (len(self._pending) >= self._batch_max_entries or
+                   time.monotonic() - self._pending_since >= self._batch_max_delay)
+        if due:
+            self.flush()
+        return True
+    
+    def flush(self) -> int:
+        """Write buffered batch entries in a single transaction; returns how many were written"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        try:
+            with self._connect(write=True) as conn:
+                for entry in pending:
+                    entry["id"] = self._insert(conn, entry)
+        except sqlite3.Error:
+            # Keep the entries for the next flush rather than losing them
+            with self._pending_lock:
+                self._pending[:0] = pending
+            raise
+        return len(pending)
+    
     def get_all_entries(self) -> List[Dict]:
         """Get all history entries, sorted by creation date (newest first)"""
-        history = self.load_history()
-        return sorted(history, key=lambda x: x.get('created_timestamp', 0), reverse=True)
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM entries ORDER BY created_timestamp DESC")]
+    
+    def get_entries_since(self, entry_id: int) -> List[Dict]:
+        """Get entries added after entry_id, oldest first"""
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM entries WHERE id > ? ORDER BY id", (entry_id,))]
+    
+    def search(self, query: str = "", provider: Optional[str] = None, component: Optional[str] = None,
+               priority: Optional[str] = None, date_from: Optional[datetime] = None,
+               date_to: Optional[datetime] = None, limit: Optional[int] = None, offset: int = 0,
+               sort_by: str = "relevance", descending: bool = True) -> List[Dict]:
+        """Search history, best match first (newest first without a query)
+
+        query supports prefixes and quoted phrases (see build_search_query);
+        the other filters match exact values and a created date range. sort_by
+        is "relevance" or a key of SORT_COLUMNS.
+        """
+        source, where, params = self._search_filter(query, provider, component, priority, date_from, date_to)
+        
+        if sort_by == "relevance" and "entries_fts" in source:
+            weights = ", ".join(str(w) for w in SEARCH_COLUMNS.values())
+            order = f"bm25(entries_fts, {weights})"
+        else:
+            column = SORT_COLUMNS.get(sort_by, "created_timestamp")
+            direction = "DESC" if descending or sort_by == "relevance" else "ASC"
+            # id breaks ties so pages are stable
+            order = f"e.{column} {direction}, e.id {direction}"
+        
+        sql = f"SELECT e.* FROM {source}{where} ORDER BY {order}"
+        if limit:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        
+        try:
+            with self._connect() as conn:
+                return [dict(row) for row in conn.execute(sql, params)]
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ History search failed: {e}")
+            return []
+    
+    def count(self, query: str = "", provider: Optional[str] = None, component: Optional[str] = None,
+              priority: Optional[str] = None, date_from: Optional[datetime] = None,
+              date_to: Optional[datetime] = None) -> int:
+        """Number of entries search() would return with the same filters"""
+        source, where, params = self._search_filter(query, provider, component, priority, date_from, date_to)
+        try:
+            with self._connect() as conn:
+                return conn.execute(f"SELECT COUNT(*) FROM {source}{where}", params).fetchone()[0]
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ History search failed: {e}")
+            return 0
+    
+    @staticmethod
+    def _search_filter(query, provider, component, priority, date_from, date_to):
+        """FROM clause, WHERE clause and parameters shared by search() and count()"""
+        where, params = [], []
+        source = "entries e"
+        match = build_search_query(query) if query else None
+        if match:
+            source = "entries_fts JOIN entries e ON e.id = entries_fts.rowid"
+            where.append("entries_fts MATCH ?")
+            params.append(match)
+        for column, value in (("provider", provider), ("component", component), ("priority", priority)):
+            if value:
+                where.append(f"e.{column} = ?")
+                params.append(value)
+        if date_from:
+            where.append("e.created_timestamp >= ?")
+            params.append(date_from.timestamp())
+        if date_to:
+            where.append("e.created_timestamp < ?")
+            params.append(date_to.timestamp())
+        return source, (" WHERE " + " AND ".join(where)) if where else "", params
+    
+    def get_latest_entries(self, component: Optional[str] = None, date_from: Optional[datetime] = None,
+                           date_to: Optional[datetime] = None) -> List[Dict]:
+        """The most recent entry for each ticket, optionally within a component and created date range"""
+        _, where, params = self._search_filter("", None, component, None, date_from, date_to)
+        sql = f"""
+            SELECT * FROM (
+                SELECT e.*, ROW_NUMBER() OVER (
+                    PARTITION BY e.jira_ticket ORDER BY e.created_timestamp DESC, e.id DESC
+                ) AS generation
+                FROM entries e{where}
+            ) WHERE generation = 1 ORDER BY jira_ticket
+        """
+        with self._connect() as conn:
+            entries = [dict(row) for row in conn.execute(sql, params)]
+        for entry in entries:
+            del entry["generation"]
+        return entries
+    
+    def get_filter_values(self) -> Dict[str, List[str]]:
+        """Distinct providers, components and priorities, for search filter options"""
+        with self._connect() as conn:
+            return {
+                column: [row[0] for row in conn.execute(
+                    f"SELECT DISTINCT {column} FROM entries WHERE {column} IS NOT NULL ORDER BY {column}")]
+                for column in ("provider", "component", "priority")
+            }
     
     def get_entry_by_id(self, entry_id: int) -> Dict:
         """Get a specific entry by ID"""
-        history = self.load_history()
-        for entry in history:
-            if entry.get('id') == entry_id:
-                return entry
-        return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        return dict(row) if row else None
     
     def delete_entry(self, entry_id: int) -> bool:
         """Delete an entry by ID"""
-        history = self.load_history()
-        new_history = [entry for entry in history if entry.get('id') != entry_id]
-        
-        if len(new_history) < len(history):
-            self.save_history(new_history)
-            return True
-        return False
+        with self._connect(write=True) as conn:
+            return conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,)).rowcount > 0
     
     def get_stats(self) -> Dict:
-        """Get statistics about the history"""
-        history = self.load_history()
-        
-        if not history:
-            return {
-                "total_entries": 0,
-                "total_files": 0,
-                "providers_used": [],
-                "most_recent": None
-            }
+        """Get statistics about the history
+
+        Totals and the per-provider, per-component and per-day breakdowns are
+        read from the incrementally maintained stats table. The number of
+        entries whose file is missing comes from the last file check; a new
+        check is started in the background once it is older than
+        HISTORY_FILE_CHECK_INTERVAL seconds (default 300).
+        """
+        with self._connect() as conn:
+            breakdowns = {dimension: {} for dimension in STATS_DIMENSIONS}
+            total_size = 0
+            for row in conn.execute("SELECT dimension, key, entries, total_size FROM stats WHERE entries > 0"):
+                if row["dimension"] == "total":
+                    total_size = row["total_size"]
+                breakdowns.setdefault(row["dimension"], {})[row["key"]] = row["entries"]
+            total = breakdowns["total"].get("all", 0)
+            most_recent = conn.execute("SELECT * FROM entries ORDER BY created_timestamp DESC LIMIT 1").fetchone()
+            meta = dict(conn.execute(
+                "SELECT key, value FROM meta WHERE key IN ('missing_files', 'files_checked_at')").fetchall())
         
-        providers = list(set(entry.get('provider', 'unknown') for entry in history))
-        total_size = sum(entry.get('file_size', 0) for entry in history)
+        checked_at = float(meta.get('files_checked_at', 0))
+        if time.time() - checked_at > float(os.getenv('HISTORY_FILE_CHECK_INTERVAL', '300')):
+            self.check_files_async()
         
         return {
-            "total_entries": len(history),
-            "total_files": len([e for e in history if os.path.exists(e.get('file_path', ''))]),
+            "total_entries": total,
+            "total_files": max(0, total - int(meta.get('missing_files', 0))),
             "total_size": total_size,
-            "providers_used": providers,
-            "most_recent": max(history, key=lambda x: x.get('created_timestamp', 0))
+            "providers_used": sorted(breakdowns["provider"]),
+            "most_recent": dict(most_recent) if most_recent else None,
+            "by_provider": breakdowns["provider"],
+            "by_component": breakdowns["component"],
+            "by_day": dict(sorted(breakdowns["day"].items())),
+            "files_checked_at": datetime.fromtimestamp(checked_at) if checked_at else None
         }
+    
+    def check_files(self) -> int:
+        """Count entries whose file no longer exists and store the result for get_stats"""
+        with self._connect() as conn:
+            file_paths = [row[0] for row in conn.execute("SELECT file_path FROM entries")]
+        missing = sum(1 for path in file_paths if not os.path.exists(path or ''))
+        with self._connect(write=True) as conn:
+            conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                             [("missing_files", str(missing)), ("files_checked_at", str(time.time()))])
+        return missing
+    
+    def check_files_async(self):
+        """Run check_files in a background thread unless one is already running for this database"""
+        with _file_check_lock:
+            if self.db_file in _file_checks:
+                return
+            _file_checks.add(self.db_file)
+        
+        def run():
+            try:
+                self.check_files()
+            except sqlite3.Error as e:
+                print(f"⚠️ History file check failed: {e}")
+            finally:
+                with _file_check_lock:
+                    _file_checks.discard(self.db_file)
+        
+        threading.Thread(target=run, name="history-file-check", daemon=True).start()
+
+# Databases with a file check in progress, so page views don't start overlapping scans
+_file_checks = set()
+_file_check_lock = threading.Lock()
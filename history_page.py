@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from history_manager import TestCaseHistory
+from output_writers import format_for_path
 
 def format_file_size(size_bytes):
     """Format file size in human readable format"""
@@ -15,6 +16,15 @@ def format_file_size(size_bytes):
     s = round(size_bytes / p, 2)
     return f"{s} {size_names[i]}"
 
+# History page sort options: label -> (sort_by, descending)
+HISTORY_SORT_OPTIONS = {
+    "Best match / newest": ("relevance", True),
+    "Newest first": ("created", True),
+    "Oldest first": ("created", False),
+    "JIRA ticket": ("jira_ticket", False),
+    "Largest file": ("file_size", True),
+}
+
 def format_datetime(iso_string):
     """Format ISO datetime string to readable format"""
     try:
@@ -31,9 +41,6 @@ def show_history_page():
     
     # Initialize history manager
     history = TestCaseHistory()
-    
-    # Get all entries
-    entries = history.get_all_entries()
     stats = history.get_stats()
     
     # Show statistics
@@ -58,43 +65,96 @@ def show_history_page():
         else:
             st.metric("Providers Used", "0")
     
-    if not entries:
+    if stats["total_entries"]:
+        with st.expander("📈 Breakdown"):
+            col_chart1, col_chart2 = st.columns(2)
+            
+            with col_chart1:
+                st.markdown("**By provider**")
+                st.bar_chart(pd.Series(stats["by_provider"], name="Generations"))
+            
+            with col_chart2:
+                st.markdown("**By component**")
+                st.bar_chart(pd.Series(stats["by_component"], name="Generations"))
+            
+            st.markdown("**Per day**")
+            st.line_chart(pd.Series(stats["by_day"], name="Generations"))
+            
+            if stats["files_checked_at"]:
+                st.caption(f"File availability last checked {stats['files_checked_at'].strftime('%Y-%m-%d %H:%M')}")
+    
+    if not stats["total_entries"]:
         st.info("📝 No test case generation history found. Start generating test cases to see them here!")
         return
     
     # Search and filter options
     st.subheader("🔍 Search & Filter")
+    filter_values = history.get_filter_values()
     col_search1, col_search2 = st.columns(2)
     
     with col_search1:
-        search_term = st.text_input("Search by JIRA ticket or criteria", placeholder="e.g., BULK-001")
-    
-    with col_search2:
-        provider_filter = st.selectbox(
-            "Filter by Provider",
-            ["All"] + stats["providers_used"]
+        search_term = st.text_input(
+            "Search by JIRA ticket or criteria",
+            placeholder='e.g., BULK-001 or "remember me"',
+            help='Words match as prefixes (log finds login); quote text to match an exact phrase'
         )
     
-    # Filter entries
-    filtered_entries = entries
-    
-    if search_term:
-        filtered_entries = [
-            entry for entry in filtered_entries
-            if search_term.lower() in entry.get('jira_ticket', '').lower() or
-               search_term.lower() in entry.get('acceptance_criteria', '').lower()
-        ]
-    
-    if provider_filter != "All":
-        filtered_entries = [
-            entry for entry in filtered_entries
-            if entry.get('provider', '').lower() == provider_filter.lower()
-        ]
-    
-    st.subheader(f"📋 History ({len(filtered_entries)} entries)")
+    with col_search2:
+        date_range = st.date_input("Created between", value=(), help="Pick a start and end date")
+    
+    col_filter1, col_filter2, col_filter3 = st.columns(3)
+    
+    with col_filter1:
+        provider_filter = st.selectbox("Filter by Provider", ["All"] + filter_values["provider"])
+    
+    with col_filter2:
+        component_filter = st.selectbox("Filter by Component", ["All"] + filter_values["component"])
+    
+    with col_filter3:
+        priority_filter = st.selectbox("Filter by Priority", ["All"] + filter_values["priority"])
+    
+    # Search and filter inside the history index
+    date_from = date_to = None
+    if len(date_range) == 2:
+        date_from = datetime.combine(date_range[0], datetime.min.time())
+        date_to = datetime.combine(date_range[1], datetime.min.time()) + timedelta(days=1)
+    filters = dict(
+        query=search_term,
+        provider=None if provider_filter == "All" else provider_filter,
+        component=None if component_filter == "All" else component_filter,
+        priority=None if priority_filter == "All" else priority_filter,
+        date_from=date_from,
+        date_to=date_to
+    )
+    total = history.count(**filters)
+    
+    # Only the current page is fetched and rendered
+    col_page1, col_page2, col_page3 = st.columns(3)
+    
+    with col_page1:
+        sort_label = st.selectbox("Sort by", list(HISTORY_SORT_OPTIONS))
+    
+    with col_page2:
+        page_size = st.selectbox("Entries per page", [10, 20, 50, 100], index=1)
+    
+    with col_page3:
+        page_count = max(1, (total + page_size - 1) // page_size)
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+    
+    sort_by, descending = HISTORY_SORT_OPTIONS[sort_label]
+    filtered_entries = history.search(
+        **filters, sort_by=sort_by, descending=descending,
+        limit=page_size, offset=(page - 1) * page_size
+    )
+    
+    st.subheader(f"📋 History ({total} entries)")
+    if total:
+        first = (page - 1) * page_size + 1
+        st.caption(f"Showing {first}-{first + len(filtered_entries) - 1} of {total}")
     
     # Display entries
-    for idx, entry in enumerate(filtered_entries):
+    for entry in filtered_entries:
+        entry_id = entry.get('id')
         with st.expander(f"🎫 {entry.get('jira_ticket', 'Unknown')} - {entry.get('priority', 'Medium')} Priority", expanded=False):
             
             # Entry details
@@ -112,7 +172,7 @@ def show_history_page():
                 criteria_text = entry.get('acceptance_criteria', 'No criteria provided')
                 if len(criteria_text) > 200:
                     with st.expander("View Full Acceptance Criteria"):
-                        st.text_area("", criteria_text, height=100, disabled=True, key=f"criteria_{idx}")
+                        st.text_area("", criteria_text, height=100, disabled=True, key=f"criteria_{entry_id}")
                     st.markdown(f"{criteria_text[:200]}...")
                 else:
                     st.markdown(criteria_text)
@@ -125,21 +185,25 @@ def show_history_page():
                 file_path = entry.get('file_path', '')
                 file_name = entry.get('file_name', 'file.xlsx')
                 
-                if os.path.exists(file_path):
+                if not os.path.exists(file_path):
+                    st.error("❌ File not found")
+                elif st.session_state.get(f"prepared_{entry_id}"):
+                    # The file is only read once a download has been requested
                     with open(file_path, 'rb') as file:
                         st.download_button(
                             label=f"📥 Download {file_name}",
                             data=file.read(),
                             file_name=file_name,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            key=f"download_{idx}"
+                            mime=format_for_path(file_name).mime,
+                            key=f"download_{entry_id}"
                         )
-                else:
-                    st.error("❌ File not found")
+                elif st.button(f"📦 Prepare {file_name}", key=f"prepare_{entry_id}", help="Load the file for download"):
+                    st.session_state[f"prepared_{entry_id}"] = True
+                    st.rerun()
                 
                 # Delete button
-                if st.button("🗑️ Delete Entry", key=f"delete_{idx}", help="Delete this history entry"):
-                    if history.delete_entry(entry.get('id')):
+                if st.button("🗑️ Delete Entry", key=f"delete_{entry_id}", help="Delete this history entry"):
+                    if history.delete_entry(entry_id):
                         st.success("Entry deleted successfully!")
                         st.rerun()
                     else:
@@ -0,0 +1,109 @@
+import re
+import json
+from typing import List, Any, Optional
+
+# Trailing commas before a closing bracket, a common LLM JSON mistake
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+def _loads_lenient(text: str) -> Optional[Any]:
+    """Parse one JSON value, repairing common model mistakes; None if unrecoverable"""
+    for candidate in (text, _TRAILING_COMMA.sub(r'\1', text)):
+        try:
+            # strict=False accepts raw newlines/tabs inside strings
+            return json.loads(candidate, strict=False)
+        except ValueError:
+            continue
+    return None
+
+class JSONArrayStreamParser:
+    """Incrementally extract the elements of a top-level JSON array
+
+    Text is fed in arbitrary chunks as it arrives from a streaming API. Each
+    call to feed() returns the array elements that were completed by that
+    chunk, so callers can act on a test case as soon as it is fully received.
+
+    Model output is rarely clean JSON, so the parser is forgiving: prose and
+    markdown code fences around the array are skipped, a '[' only starts the
+    array when it is followed by an object (so "[Note]" in prose is ignored),
+    and an element that cannot be parsed even after repair is dropped and
+    counted in ``errors`` without losing the elements around it.
+    """
+
+    def __init__(self):
+        self._depth = 0  # 0 = before the array, 1 = between elements, >1 = inside an element
+        self._pending_open = False  # saw '[' and waiting to see whether an object follows
+        self._element: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self.done = False
+        self.errors = 0
+        self.count = 0
+
+    @property
+    def in_element(self) -> bool:
+        """True if an element has started but not yet been completed"""
+        return self._depth > 1
+
+    def feed(self, text: str) -> List[Any]:
+        """Consume a chunk of text and return any newly completed elements"""
+        items = []
+        for ch in text:
+            if self.done:
+                break
+
+            if self._depth == 0:
+                if self._pending_open:
+                    if ch.isspace():
+                        continue
+                    self._pending_open = False
+                    if ch == '{':
+                        self._depth = 1
+                    elif ch == ']':
+                        # Empty array
+                        self.done = True
+                        continue
+                    else:
+                        if ch == '[':
+                            self._pending_open = True
+                        continue
+                elif ch == '[':
+                    self._pending_open = True
+                    continue
+                else:
+                    continue
+
+            if self._depth == 1:
+                if ch == ']':
+                    self.done = True
+                elif ch in '{[':
+                    self._element = [ch]
+                    self._depth = 2
+                continue
+
+            self._element.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 1:
+                    item = _loads_lenient(''.join(self._element))
+                    if item is None:
+                        self.errors += 1
+                    else:
+                        items.append(item)
+                        self.count += 1
+                    self._element = []
+        return items
+
+def parse_json_array(text: str) -> List[Any]:
+    """Parse every recoverable element of the first JSON array of objects in text"""
+    return JSONArrayStreamParser().feed(text)
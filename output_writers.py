@@ -0,0 +1,231 @@
+import io
+import os
+import csv
+import json
+import math
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+@dataclass
+class OutputFormat:
+    """A file format generated test cases can be written in"""
+    name: str
+    extension: str
+    mime: str
+    label: str
+    # write(output, columns, *row_sources) -> rows written; output is a path or binary file
+    write: Callable[..., int]
+    # read(path) -> (columns, rows), for consolidating generated files
+    read: Optional[Callable[[str], Tuple[List[str], List[Dict]]]] = None
+
+def cell_value(value):
+    """Convert a row value to something a writer can store (NaN/None -> empty cell)"""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "item"):
+        # numpy scalars
+        return cell_value(value.item())
+    if isinstance(value, (list, dict)):
+        return str(value)
+    return value
+
+def dataframe_rows(df) -> Iterable[Dict]:
+    """Iterate a DataFrame's rows as dicts without copying the whole frame"""
+    columns = list(df.columns)
+    for values in df.itertuples(index=False, name=None):
+        yield dict(zip(columns, values))
+
+def combined_columns(columns: List[str], rows: Optional[List[Dict]] = None) -> List[str]:
+    """columns followed by any other keys found in rows, in first-seen order
+
+    Matches the columns pd.concat would produce when appending rows to a template.
+    """
+    result = list(columns)
+    seen = set(result)
+    for row in rows or []:
+        for key in row:
+            if key not in seen:
+                seen.add(key)
+                result.append(key)
+    return result
+
+@contextmanager
+def _open_binary(output) -> Iterator:
+    """Yield a binary file for a path or an already open binary file-like object"""
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, 'wb') as f:
+            yield f
+    else:
+        yield output
+
+def _json_value(value):
+    """Like cell_value, but also makes dates and other objects JSON-serializable"""
+    value = cell_value(value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+def _csv_value(value):
+    value = cell_value(value)
+    return "" if value is None else value
+
+def write_csv(output, columns: List[str], *row_sources: Iterable[Dict]) -> int:
+    count = 0
+    with _open_binary(output) as f:
+        text = io.TextIOWrapper(f, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow(columns)
+        for rows in row_sources:
+            for row in rows:
+                writer.writerow([_csv_value(row.get(c)) for c in columns])
+                count += 1
+        # Flush without closing a caller's file
+        text.flush()
+        text.detach()
+    return count
+
+def write_jsonl(output, columns: List[str], *row_sources: Iterable[Dict]) -> int:
+    count = 0
+    with _open_binary(output) as f:
+        for rows in row_sources:
+            for row in rows:
+                record = {c: _json_value(row.get(c)) for c in columns}
+                f.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n")
+                count += 1
+    return count
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow output require pyarrow. Install with: pip install pyarrow")
+    return pyarrow
+
+def _record_batches(pa, columns: List[str], row_sources, batch_size: int = 1000):
+    """Yield pyarrow record batches of string columns, batch_size rows at a time"""
+    schema = pa.schema([(c, pa.string()) for c in columns])
+    batch = []
+    for rows in row_sources:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield _to_batch(pa, schema, columns, batch)
+                batch = []
+    if batch:
+        yield _to_batch(pa, schema, columns, batch)
+
+def _to_batch(pa, schema, columns: List[str], rows: List[Dict]):
+    arrays = []
+    for c in columns:
+        values = (_json_value(row.get(c)) for row in rows)
+        arrays.append(pa.array([None if v is None else str(v) for v in values], pa.string()))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def write_parquet(output, columns: List[str], *row_sources: Iterable[Dict]) -> int:
+    pa = _import_pyarrow()
+    import pyarrow.parquet as pq
+    schema = pa.schema([(c, pa.string()) for c in columns])
+    count = 0
+    with _open_binary(output) as f, pq.ParquetWriter(f, schema) as writer:
+        for batch in _record_batches(pa, columns, row_sources):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+def write_arrow(output, columns: List[str], *row_sources: Iterable[Dict]) -> int:
+    pa = _import_pyarrow()
+    schema = pa.schema([(c, pa.string()) for c in columns])
+    count = 0
+    with _open_binary(output) as f, pa.ipc.new_file(f, schema) as writer:
+        for batch in _record_batches(pa, columns, row_sources):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+def write_xlsx(output, columns: List[str], *row_sources: Iterable[Dict]) -> int:
+    # openpyxl is only imported once a workbook is written
+    from excel_writer import write_workbook
+    return write_workbook(output, columns, *row_sources)
+
+def read_xlsx(path: str) -> Tuple[List[str], List[Dict]]:
+    """Read the first sheet of a workbook as (header, rows) in openpyxl's read-only mode"""
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(c) for c in next(rows, ()) if c is not None]
+        return header, [dict(zip(header, values)) for values in rows if any(v is not None for v in values)]
+    finally:
+        workbook.close()
+
+def read_csv(path: str) -> Tuple[List[str], List[Dict]]:
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        rows = [{k: (v if v != "" else None) for k, v in row.items()} for row in reader]
+        return list(reader.fieldnames or []), rows
+
+def read_jsonl(path: str) -> Tuple[List[str], List[Dict]]:
+    with open(path, encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return (list(rows[0]) if rows else []), rows
+
+def read_parquet(path: str) -> Tuple[List[str], List[Dict]]:
+    _import_pyarrow()
+    import pyarrow.parquet as pq
+    table = pq.read_table(path)
+    return table.column_names, table.to_pylist()
+
+def read_arrow(path: str) -> Tuple[List[str], List[Dict]]:
+    pa = _import_pyarrow()
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.column_names, table.to_pylist()
+
+# Output formats by name; register_output_format adds more
+OUTPUT_FORMATS: Dict[str, OutputFormat] = {}
+
+def register_output_format(output_format: OutputFormat):
+    """Make a format available to --format, the web UI and write_output"""
+    OUTPUT_FORMATS[output_format.name] = output_format
+
+register_output_format(OutputFormat(
+    "xlsx", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "Excel", write_xlsx, read_xlsx))
+register_output_format(OutputFormat("csv", ".csv", "text/csv", "CSV", write_csv, read_csv))
+register_output_format(OutputFormat("jsonl", ".jsonl", "application/x-ndjson", "JSON Lines", write_jsonl, read_jsonl))
+register_output_format(OutputFormat("parquet", ".parquet", "application/vnd.apache.parquet", "Parquet", write_parquet, read_parquet))
+register_output_format(OutputFormat("arrow", ".arrow", "application/vnd.apache.arrow.file", "Arrow", write_arrow, read_arrow))
+
+def get_output_format(name: str) -> OutputFormat:
+    """Look up an output format by name (case-insensitive)"""
+    try:
+        return OUTPUT_FORMATS[name.lower().lstrip('.')]
+    except KeyError:
+        raise ValueError(f"Unsupported output format: {name} (choose from {', '.join(OUTPUT_FORMATS)})")
+
+def format_for_path(path: str, default: str = "xlsx") -> OutputFormat:
+    """The output format matching a file's extension, or default if none matches"""
+    extension = os.path.splitext(path)[1].lower()
+    for output_format in OUTPUT_FORMATS.values():
+        if output_format.extension == extension:
+            return output_format
+    return OUTPUT_FORMATS[default]
+
+def write_output(output, columns: List[str], *row_sources: Iterable[Dict],
+                 format_name: Optional[str] = None) -> int:
+    """Write rows in format_name, or the format matching the output path's extension"""
+    if format_name:
+        output_format = get_output_format(format_name)
+    elif isinstance(output, (str, os.PathLike)):
+        output_format = format_for_path(os.fspath(output))
+    else:
+        output_format = OUTPUT_FORMATS["xlsx"]
+    return output_format.write(output, columns, *row_sources)
+
+def to_bytes(format_name: str, columns: List[str], *row_sources: Iterable[Dict]) -> bytes:
+    """Serialize rows in memory"""
+    buffer = io.BytesIO()
+    get_output_format(format_name).write(buffer, columns, *row_sources)
+    return buffer.getvalue()
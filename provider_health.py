@@ -0,0 +1,159 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+class ProviderHealth:
+    """Latency/error tracking and circuit breaker for one provider backend
+
+    Latency and error rate are exponentially weighted moving averages, so
+    recent calls dominate. The circuit opens after failure_threshold
+    consecutive failures (or once the error rate passes error_rate_threshold),
+    rejecting requests for cooldown seconds. After the cooldown one probe
+    request is let through ("half-open"): success closes the circuit, failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, alpha: float = 0.3, failure_threshold: int = 3,
+                 error_rate_threshold: float = 0.5, cooldown: float = 30.0, min_samples: int = 5):
+        self.name = name
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+
+        self.latency: Optional[float] = None  # EWMA seconds of successful calls
+        self._latencies = deque(maxlen=200)  # recent successful call latencies, for percentiles
+        self.error_rate = 0.0
+        self.samples = 0
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str) -> "ProviderHealth":
+        """Build from ROUTER_FAILURE_THRESHOLD, ROUTER_ERROR_RATE_THRESHOLD and ROUTER_COOLDOWN"""
+        return cls(
+            name,
+            failure_threshold=int(os.getenv('ROUTER_FAILURE_THRESHOLD', '3')),
+            error_rate_threshold=float(os.getenv('ROUTER_ERROR_RATE_THRESHOLD', '0.5')),
+            cooldown=float(os.getenv('ROUTER_COOLDOWN', '30'))
+        )
+
+    def acquire(self) -> bool:
+        """True if a request may be sent now (always when closed, one probe when half-open)"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    @property
+    def available(self) -> bool:
+        """True if the circuit would currently let a request through"""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self._opened_at >= self.cooldown
+            return self.state == self.CLOSED or not self._probe_in_flight
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.samples += 1
+            self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+            self._latencies.append(latency)
+            self.error_rate = (1 - self.alpha) * self.error_rate
+            self.consecutive_failures = 0
+            if self.state != self.CLOSED:
+                print(f"✅ {self.name} recovered; circuit closed")
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_censored(self, latency: float):
+        """Record a call cancelled after latency seconds, e.g. the loser of a hedged request
+
+        Its true latency is at least this long, so it is kept as a latency sample
+        (otherwise percentiles only see the fast calls that finished). Error
+        rate and circuit state are left alone since the call neither succeeded
+        nor failed.
+        """
+        with self._lock:
+            self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+            self._latencies.append(latency)
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.samples += 1
+            self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+            self.consecutive_failures += 1
+            failing = (self.consecutive_failures >= self.failure_threshold or
+                       (self.samples >= self.min_samples and self.error_rate >= self.error_rate_threshold))
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and failing):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                print(f"🔌 {self.name} circuit open for {self.cooldown:.0f}s "
+                      f"({self.consecutive_failures} consecutive failures, error rate {self.error_rate:.0%})")
+            self._probe_in_flight = False
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p-th percentile (0-100) of recent latencies, or None with fewer than min_samples"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            return None
+        rank = (len(samples) - 1) * min(max(p, 0.0), 100.0) / 100.0
+        low = int(rank)
+        high = min(low + 1, len(samples) - 1)
+        return samples[low] + (samples[high] - samples[low]) * (rank - low)
+
+    def mean_latency_above(self, threshold: float) -> Optional[float]:
+        """Expected latency of a call known to still be running after threshold seconds
+
+        This is the mean of recent latencies longer than threshold, or None if none were.
+        """
+        with self._lock:
+            slow = [latency for latency in self._latencies if latency > threshold]
+        return sum(slow) / len(slow) if slow else None
+
+    def score(self) -> float:
+        """Expected cost of routing here; lower is better
+
+        Latency is inflated by the error rate since a failed call costs a retry
+        elsewhere. Backends with no successful calls yet score 0 so they are tried.
+        """
+        with self._lock:
+            return (self.latency or 0.0) / max(0.05, 1.0 - self.error_rate)
+
+    def get_stats(self) -> Dict:
+        """Current health, for logging"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "latency": self.latency,
+                "error_rate": self.error_rate,
+                "samples": self.samples
+            }
+
+# One health tracker per provider, shared by every router in the process
+_health: Dict[str, ProviderHealth] = {}
+_health_lock = threading.Lock()
+
+def get_provider_health(name: str) -> ProviderHealth:
+    """Return the process-wide health tracker for a provider"""
+    with _health_lock:
+        if name not in _health:
+            _health[name] = ProviderHealth.from_env(name)
+        return _health[name]
@@ -0,0 +1,221 @@
+import os
+import re
+import time
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Optional, Mapping
+
+def parse_duration(value) -> Optional[float]:
+    """Parse a rate-limit reset/Retry-After value ("7.66s", "2m59.56s", "120ms", "30") into seconds"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+class TokenBucket:
+    """Token bucket refilled continuously up to capacity over one minute"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount tokens are available (0 if they are now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def give(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def cap(self, remaining: float):
+        """Never believe we have more tokens than the server says remain"""
+        self.tokens = min(self.tokens, remaining)
+
+class RateLimiter:
+    """Requests/min and tokens/min limits with adaptive concurrency for one provider
+
+    Every request reserves one request token and an estimate of its LLM tokens
+    before it is sent. Concurrency follows additive-increase/multiplicative-
+    decrease: it halves on HTTP 429 and creeps back up with each success.
+    Rate-limit response headers (x-ratelimit-remaining-*, x-ratelimit-reset-*,
+    Retry-After) pull the local buckets in line with what the server reports.
+    """
+
+    def __init__(self, name: str, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_concurrency: int = 8):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = float(self.max_concurrency)
+        self.in_flight = 0
+        self.rate_limited_count = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_concurrency: int = 8) -> "RateLimiter":
+        """Build a limiter from {NAME}_REQUESTS_PER_MINUTE, {NAME}_TOKENS_PER_MINUTE and {NAME}_MAX_CONCURRENCY"""
+        prefix = name.upper()
+        rpm = os.getenv(f"{prefix}_REQUESTS_PER_MINUTE")
+        tpm = os.getenv(f"{prefix}_TOKENS_PER_MINUTE")
+        concurrency = os.getenv(f"{prefix}_MAX_CONCURRENCY")
+        return cls(
+            name,
+            requests_per_minute=float(rpm) if rpm else requests_per_minute,
+            tokens_per_minute=float(tpm) if tpm else tokens_per_minute,
+            max_concurrency=int(concurrency) if concurrency else max_concurrency
+        )
+
+    def _reserve(self, tokens: float) -> float:
+        """Take a slot and budget for one request, or return how long to wait before retrying"""
+        with self._lock:
+            now = time.monotonic()
+            waits = [self._paused_until - now]
+            if self.in_flight >= int(self.concurrency):
+                waits.append(0.05)
+            if self.requests:
+                waits.append(self.requests.wait_time(1, now))
+            if self.tokens:
+                waits.append(self.tokens.wait_time(tokens, now))
+            wait = max(waits)
+            if wait > 0:
+                return wait
+
+            self.in_flight += 1
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            return 0.0
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    @contextmanager
+    def limit(self, tokens: float = 0):
+        """Block until a request estimated at ``tokens`` LLM tokens may be sent"""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                break
+            time.sleep(min(wait, 1.0))
+        try:
+            yield self
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def alimit(self, tokens: float = 0):
+        """Async variant of limit() that waits without blocking the event loop"""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(min(wait, 1.0))
+        try:
+            yield self
+        finally:
+            self._release()
+
+    def on_success(self):
+        """Additive increase: roughly one extra slot per window of successful requests"""
+        with self._lock:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / max(self.concurrency, 1.0))
+
+    def on_rate_limited(self, retry_after=None):
+        """Multiplicative decrease after HTTP 429, pausing all requests for Retry-After"""
+        delay = parse_duration(retry_after)
+        with self._lock:
+            self.rate_limited_count += 1
+            self.concurrency = max(1.0, self.concurrency / 2)
+            if delay is None:
+                delay = 60.0 / self.requests.capacity if self.requests else 1.0
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        print(f"⏳ {self.name} rate limit hit; pausing {delay:.1f}s (concurrency {int(self.concurrency)})")
+
+    def reconcile(self, estimated: float, actual: float):
+        """Refund the difference between estimated and actual token usage"""
+        if self.tokens and actual is not None and actual < estimated:
+            with self._lock:
+                self.tokens.give(estimated - actual)
+
+    def update_from_headers(self, headers: Mapping):
+        """Sync local buckets with the provider's x-ratelimit-* response headers"""
+        if not headers:
+            return
+        with self._lock:
+            now = time.monotonic()
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                limit = headers.get(f"x-ratelimit-limit-{kind}")
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                if remaining is None:
+                    continue
+                try:
+                    remaining = float(remaining)
+                except ValueError:
+                    continue
+
+                # Learn the token budget from the server when it wasn't configured
+                if bucket is None and kind == "tokens" and limit:
+                    try:
+                        bucket = self.tokens = TokenBucket(float(limit))
+                    except ValueError:
+                        pass
+                if bucket is not None:
+                    bucket.cap(remaining)
+
+                if remaining <= 0:
+                    reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                    if reset:
+                        self._paused_until = max(self._paused_until, now + reset)
+
+    def get_stats(self) -> Dict:
+        """Current limiter state, for logging"""
+        with self._lock:
+            return {
+                "concurrency": int(self.concurrency),
+                "in_flight": self.in_flight,
+                "rate_limited": self.rate_limited_count
+            }
+
+# One limiter per provider, shared by every generator in the process
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+# Defaults for providers with well-known free-tier limits; override via env
+_DEFAULT_LIMITS = {
+    "groq": {"requests_per_minute": 30},
+    "gemini": {"requests_per_minute": 15},
+    "ollama": {"max_concurrency": 4},
+}
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """Return the process-wide rate limiter for a provider"""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter.from_env(name, **_DEFAULT_LIMITS.get(name, {}))
+        return _limiters[name]
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import List, Dict, Optional
+
+class ResponseCache:
+    """Disk-backed cache of generated test cases
+
+    Entries are keyed on a hash of the rendered prompt, provider, model and
+    sampling parameters, and evicted least-recently-used once the cache grows
+    past max_entries / max_bytes or an entry is older than ttl_seconds.
+    """
+
+    def __init__(self, cache_file: Optional[str] = None, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.cache_file = cache_file or os.getenv('RESPONSE_CACHE_FILE', 'testcases/response_cache.db')
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '1000'))
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.getenv('RESPONSE_CACHE_MAX_MB', '50')) * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv('RESPONSE_CACHE_TTL', str(7 * 24 * 3600)))
+
+        # Counters for this instance; lifetime totals are kept in the database
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(self.cache_file)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.cache_file, timeout=30)
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str, temperature: Optional[float] = None,
+                 seed: Optional[int] = None, **extra) -> str:
+        """Hash everything that determines the generated output into a cache key"""
+        material = {
+            "provider": provider,
+            "model": model,
+            "prompt": prompt,
+            "temperature": temperature,
+            "seed": seed,
+            **extra
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Return cached test cases for key, or None on a miss"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self._count(conn, 'hits')
+                self.hits += 1
+                return json.loads(row[0])
+
+            if row:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count(conn, 'misses')
+            self.misses += 1
+            return None
+
+    def set(self, key: str, test_cases: List[Dict]):
+        """Store test cases under key and evict entries over the configured limits"""
+        value = json.dumps(test_cases, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode('utf-8')), now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then least recently used ones until within limits"""
+        conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evict = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evict.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+
+    def _count(self, conn: sqlite3.Connection, name: str):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def get_stats(self) -> Dict:
+        """Get cache size and hit/miss counters"""
+        with self._connect() as conn:
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+
+        total_hits = counters.get('hits', 0)
+        total_misses = counters.get('misses', 0)
+        lookups = total_hits + total_misses
+        return {
+            "entries": entries,
+            "total_size": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": total_hits,
+            "total_misses": total_misses,
+            "hit_rate": total_hits / lookups if lookups else 0.0
+        }
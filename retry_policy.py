@@ -0,0 +1,126 @@
+import os
+import time
+import random
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple, TypeVar, Awaitable
+from rate_limiter import parse_duration
+
+T = TypeVar('T')
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# Exception class names (anywhere in the MRO) for transient network failures in
+# requests, httpx and the standard library
+RETRYABLE_EXCEPTION_NAMES = {
+    'Timeout', 'TimeoutError', 'TimeoutException',
+    'ConnectionError', 'ConnectionResetError', 'ChunkedEncodingError',
+    'TransportError', 'NetworkError', 'RemoteProtocolError'
+}
+
+class RetryableError(Exception):
+    """Base class for errors that are always worth another attempt"""
+
+def classify_error(error: Exception) -> Tuple[bool, Optional[float]]:
+    """Return (retryable, retry_after_seconds) for an exception from a provider call"""
+    if isinstance(error, RetryableError):
+        return True, None
+
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None and isinstance(getattr(error, 'code', None), int):
+        # google.api_core exceptions carry the HTTP status as .code
+        status = error.code
+    if status is not None:
+        headers = getattr(response, 'headers', None) or {}
+        return status in RETRYABLE_STATUS, parse_duration(headers.get('retry-after'))
+
+    names = {cls.__name__ for cls in type(error).__mro__}
+    return bool(names & RETRYABLE_EXCEPTION_NAMES), None
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff with a cap on total retry time
+
+    Delays are drawn uniformly from [0, min(max_delay, base_delay * 2**attempt)]
+    ("full jitter"), except that a server-provided Retry-After is always honored.
+    No retry is attempted if it would push the call past max_total_time, or
+    past an explicit deadline shared by several calls (e.g. one ticket).
+    """
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    max_total_time: float = 120.0
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Read RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY and RETRY_MAX_TOTAL_SECONDS"""
+        return cls(
+            max_attempts=int(os.getenv('RETRY_MAX_ATTEMPTS', cls.max_attempts)),
+            base_delay=float(os.getenv('RETRY_BASE_DELAY', cls.base_delay)),
+            max_delay=float(os.getenv('RETRY_MAX_DELAY', cls.max_delay)),
+            max_total_time=float(os.getenv('RETRY_MAX_TOTAL_SECONDS', cls.max_total_time))
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number ``attempt`` (1-based)"""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def deadline(self) -> float:
+        """time.monotonic() value max_total_time from now"""
+        return time.monotonic() + self.max_total_time
+
+    def _next_delay(self, error: Exception, attempt: int, deadline: float) -> Optional[float]:
+        """Delay before the next attempt, or None if error should be raised"""
+        retryable, retry_after = classify_error(error)
+        if not retryable or attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt, retry_after)
+        if time.monotonic() + delay > deadline:
+            return None
+        return delay
+
+    def call(self, fn: Callable[[int], T],
+             on_retry: Optional[Callable[[int, Exception, float], None]] = None,
+             deadline: Optional[float] = None) -> T:
+        """Call fn(attempt) until it succeeds, retrying retryable errors
+
+        Retries stop at deadline (a time.monotonic() value) if given, else
+        max_total_time after this call started.
+        """
+        if deadline is None:
+            deadline = self.deadline()
+        attempt = 0
+        while True:
+            try:
+                return fn(attempt)
+            except Exception as e:
+                attempt += 1
+                delay = self._next_delay(e, attempt, deadline)
+                if delay is None:
+                    raise
+                if on_retry:
+                    on_retry(attempt, e, delay)
+                time.sleep(delay)
+
+    async def acall(self, fn: Callable[[int], Awaitable[T]],
+                    on_retry: Optional[Callable[[int, Exception, float], None]] = None,
+                    deadline: Optional[float] = None) -> T:
+        """Async variant of call()"""
+        if deadline is None:
+            deadline = self.deadline()
+        attempt = 0
+        while True:
+            try:
+                return await fn(attempt)
+            except Exception as e:
+                attempt += 1
+                delay = self._next_delay(e, attempt, deadline)
+                if delay is None:
+                    raise
+                if on_retry:
+                    on_retry(attempt, e, delay)
+                await asyncio.sleep(delay)
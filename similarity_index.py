@@ -0,0 +1,103 @@
+import re
+import zlib
+import threading
+import numpy as np
+from typing import List, Dict, Tuple, Set, Hashable
+
+# Mersenne prime and output mask for the universal hash family
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def shingles(text: str, k: int = 3) -> Set[str]:
+    """Word k-shingles of normalized text (lowercase, punctuation removed)"""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+class SimilarityIndex:
+    """MinHash/LSH index for finding near-duplicate acceptance criteria
+
+    Each document is reduced to a MinHash signature of num_perm values, split
+    into bands of rows_per_band. Documents sharing any band bucket become
+    candidates, and candidates are scored by the fraction of matching
+    signature values, which estimates the Jaccard similarity of their shingles.
+    """
+
+    def __init__(self, num_perm: int = 128, rows_per_band: int = 4, shingle_size: int = 3, seed: int = 1):
+        if num_perm % rows_per_band:
+            raise ValueError("num_perm must be a multiple of rows_per_band")
+        self.num_perm = num_perm
+        self.rows_per_band = rows_per_band
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[Hashable]]] = [{} for _ in range(num_perm // rows_per_band)]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._signatures
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of text"""
+        tokens = shingles(text, self.shingle_size)
+        if not tokens:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.array([zlib.crc32(t.encode('utf-8')) for t in tokens], dtype=np.uint64)
+        # ((a * h + b) mod p) truncated to 32 bits for every permutation/shingle pair;
+        # uint64 wrap-around in a * h is harmless since only the low bits are kept
+        with np.errstate(over='ignore'):
+            values = ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME) & np.uint64(_MAX_HASH)
+        return values.min(axis=1)
+
+    def _bands(self, signature: np.ndarray):
+        r = self.rows_per_band
+        for band in range(len(self._buckets)):
+            yield band, signature[band * r:(band + 1) * r].tobytes()
+
+    def add(self, key: Hashable, text: str):
+        """Index text under key (re-adding a key replaces its text)"""
+        signature = self.signature(text)
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+            self._signatures[key] = signature
+            for band, bucket_key in self._bands(signature):
+                self._buckets[band].setdefault(bucket_key, set()).add(key)
+
+    def remove(self, key: Hashable):
+        """Remove key from the index if present"""
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+
+    def _remove(self, key: Hashable):
+        signature = self._signatures.pop(key)
+        for band, bucket_key in self._bands(signature):
+            bucket = self._buckets[band].get(bucket_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][bucket_key]
+
+    def query(self, text: str, threshold: float = 0.0, limit: int = 5) -> List[Tuple[Hashable, float]]:
+        """Return (key, estimated similarity) pairs at or above threshold, best first"""
+        signature = self.signature(text)
+        with self._lock:
+            candidates = set()
+            for band, bucket_key in self._bands(signature):
+                candidates.update(self._buckets[band].get(bucket_key, ()))
+            scored = [
+                (key, float(np.mean(self._signatures[key] == signature)))
+                for key in candidates
+            ]
+        scored = [item for item in scored if item[1] >= threshold]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
@@ -1,10 +1,10 @@
 import streamlit as st
 import pandas as pd
 import os
-from test_case_generator import TestCaseGenerator, TestCaseData
+from test_case_generator import TestCaseGenerator, TestCaseData, DETERMINISTIC_SEED
 from history_manager import TestCaseHistory
-import tempfile
-from datetime import datetime
+from output_writers import OUTPUT_FORMATS, format_for_path
+from datetime import datetime, timedelta
 
 # Page configuration
 st.set_page_config(
@@ -25,6 +25,15 @@ def format_file_size(size_bytes):
     s = round(size_bytes / p, 2)
     return f"{s} {size_names[i]}"
 
+# History page sort options: label -> (sort_by, descending)
+HISTORY_SORT_OPTIONS = {
+    "Best match / newest": ("relevance", True),
+    "Newest first": ("created", True),
+    "Oldest first": ("created", False),
+    "JIRA ticket": ("jira_ticket", False),
+    "Largest file": ("file_size", True),
+}
+
 def format_datetime(iso_string):
     """Format ISO datetime string to readable format"""
     try:
@@ -42,8 +51,8 @@ def show_generator_page():
     # AI Provider selection
     provider = st.selectbox(
         "Select AI Provider",
-        ["groq", "ollama", "gemini"],
-        help="Choose your preferred AI provider"
+        ["groq", "ollama", "gemini", "auto"],
+        help="Choose your preferred AI provider, or 'auto' to route to whichever configured provider is healthiest"
     )
 
     if provider == "groq":
@@ -52,6 +61,8 @@ def show_generator_page():
         st.info("💡 **Ollama Setup:** Install Ollama locally, run `ollama pull llama3.2` and start with `ollama serve`")
     elif provider == "gemini":
         st.info("💡 **Gemini Setup:** Get free API key from makersuite.google.com and add to .env file as GEMINI_API_KEY")
+    elif provider == "auto":
+        st.info("💡 **Auto:** Routes each request to the fastest healthy provider among those configured, failing over if one is down")
 
     # Template file upload
     st.subheader("📄 Template (Optional)")
@@ -117,6 +128,54 @@ def show_generator_page():
             help="Automation readiness status"
         )
 
+    # Generation options
+    with st.expander("⚙️ Generation Options"):
+        deterministic = st.checkbox(
+            "Deterministic output",
+            value=False,
+            help="Use temperature 0 and a fixed seed so regenerating the same ticket gives the same result"
+        )
+        bypass_cache = st.checkbox(
+            "Bypass response cache",
+            value=False,
+            help="Always call the AI provider, even if these criteria were generated before (also turns off reuse from similar tickets)"
+        )
+        reuse_similar = st.checkbox(
+            "Reuse test cases from similar tickets",
+            value=False,
+            disabled=bypass_cache,
+            help="If a past ticket has nearly identical acceptance criteria, adapt its test cases instead of calling the AI provider"
+        ) and not bypass_cache
+        reuse_threshold = st.slider(
+            "Similarity threshold",
+            min_value=0.5,
+            max_value=1.0,
+            value=0.85,
+            step=0.01,
+            disabled=not reuse_similar
+        )
+        split_criteria = st.checkbox(
+            "Split long criteria into sections",
+            value=False,
+            help="Generate each requirement group or navigation flow in parallel and merge the results; avoids truncated output on big tickets"
+        )
+        structured_output = st.checkbox(
+            "Structured output",
+            value=False,
+            help="Use the provider's JSON mode with a test case schema; invalid test cases are repaired instead of regenerating everything"
+        )
+        hedge_provider = st.selectbox(
+            "Hedge with",
+            ["Off"] + [p for p in ["groq", "ollama", "gemini"] if p != provider],
+            help="If the selected provider is slower than usual, also send the request to this provider and keep whichever answers first"
+        )
+        output_format = st.selectbox(
+            "Output format",
+            list(OUTPUT_FORMATS),
+            format_func=lambda name: OUTPUT_FORMATS[name].label,
+            help="File format for the saved and downloaded test cases (Parquet and Arrow need pyarrow)"
+        )
+
     # Generate button
     st.markdown("---")
     col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
@@ -146,32 +205,61 @@ def show_generator_page():
                     )
                     
                     # Initialize generator
-                    generator = TestCaseGenerator(provider)
+                    generator = TestCaseGenerator(
+                        provider,
+                        use_cache=not bypass_cache,
+                        temperature=0.0 if deterministic else None,
+                        seed=DETERMINISTIC_SEED if deterministic else None,
+                        reuse_threshold=reuse_threshold if reuse_similar else None,
+                        hedge_provider=None if hedge_provider == "Off" else hedge_provider,
+                        split_criteria=split_criteria,
+                        structured_output=structured_output
+                    )
                     
-                    # Handle template
-                    template_path = "Testcases_template.xlsx"
-                    if uploaded_template:
-                        # Save uploaded template to temporary file
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                            tmp_file.write(uploaded_template.getvalue())
-                            template_path = tmp_file.name
+                    # Uploaded templates are read straight from memory
+                    template = uploaded_template.getvalue() if uploaded_template else "Testcases_template.xlsx"
                     
                     # Create testcases directory if it doesn't exist
                     testcases_dir = "testcases"
                     os.makedirs(testcases_dir, exist_ok=True)
                     
+                    # Show test cases as they stream in from the provider
+                    live_table = st.empty()
+                    streamed_cases = []
+                    
+                    def show_test_case(test_case):
+                        streamed_cases.append(test_case)
+                        live_table.dataframe(pd.DataFrame(streamed_cases), use_container_width=True)
+                    
                     # Generate test cases with timestamp
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    output_filename = f"{jira_ticket}_testcases_{timestamp}.xlsx"
+                    output_filename = f"{jira_ticket}_testcases_{timestamp}{OUTPUT_FORMATS[output_format].extension}"
                     output_path = os.path.join(testcases_dir, output_filename)
-                    success = generator.generate_from_template(template_path, output_path, test_data)
+                    try:
+                        result = generator.generate_result(test_data, template, output_path,
+                                                           on_test_case=show_test_case)
+                    except Exception as e:
+                        print(f"Error generating test cases: {e}")
+                        result = None
+                    live_table.empty()
                     
-                    if success:
+                    if result:
                         st.success(f"✅ Test cases generated successfully!")
+                        info = result.info
+                        if info and info.source == "cache":
+                            st.caption("♻️ Served from the response cache (enable 'Bypass response cache' to regenerate)")
+                        elif info and info.source == "similar":
+                            st.caption(f"♻️ Adapted from {info.reused_from} (similarity {info.similarity:.2f}); "
+                                       "enable 'Bypass response cache' to regenerate")
+                        elif info and info.hedged:
+                            saved_note = f", saving ~{info.latency_saved:.1f}s" if info.latency_saved else ""
+                            st.caption(f"🏁 Hedged request won by {info.provider}{saved_note}")
+                        elif info and provider == "auto":
+                            st.caption(f"🔀 Generated by {info.provider}")
                         st.info(f"📁 File saved to: `{output_path}`")
                         
                         # Display generated test cases
-                        df = pd.read_excel(output_path)
+                        df = result.data
                         
                         # Show summary
                         st.subheader("📊 Summary")
@@ -188,18 +276,13 @@ def show_generator_page():
                         st.dataframe(df, use_container_width=True)
                         
                         # Download button
-                        with open(output_path, 'rb') as file:
-                            st.download_button(
-                                label="📥 Download Excel File",
-                                data=file.read(),
-                                file_name=output_filename,
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                                type="primary"
-                            )
-                        
-                        # Clean up temporary files
-                        if uploaded_template and os.path.exists(template_path):
-                            os.unlink(template_path)
+                        st.download_button(
+                            label=f"📥 Download {OUTPUT_FORMATS[output_format].label} File",
+                            data=result.export(output_format),
+                            file_name=output_filename,
+                            mime=OUTPUT_FORMATS[output_format].mime,
+                            type="primary"
+                        )
                             
                     else:
                         st.error("❌ Failed to generate test cases. Please check your configuration and try again.")
@@ -215,9 +298,6 @@ def show_history_page():
     
     # Initialize history manager
     history = TestCaseHistory()
-    
-    # Get all entries
-    entries = history.get_all_entries()
     stats = history.get_stats()
     
     # Show statistics
@@ -242,43 +322,96 @@ def show_history_page():
         else:
             st.metric("Providers Used", "0")
     
-    if not entries:
+    if stats["total_entries"]:
+        with st.expander("📈 Breakdown"):
+            col_chart1, col_chart2 = st.columns(2)
+            
+            with col_chart1:
+                st.markdown("**By provider**")
+                st.bar_chart(pd.Series(stats["by_provider"], name="Generations"))
+            
+            with col_chart2:
+                st.markdown("**By component**")
+                st.bar_chart(pd.Series(stats["by_component"], name="Generations"))
+            
+            st.markdown("**Per day**")
+            st.line_chart(pd.Series(stats["by_day"], name="Generations"))
+            
+            if stats["files_checked_at"]:
+                st.caption(f"File availability last checked {stats['files_checked_at'].strftime('%Y-%m-%d %H:%M')}")
+    
+    if not stats["total_entries"]:
         st.info("📝 No test case generation history found. Start generating test cases to see them here!")
         return
     
     # Search and filter options
     st.subheader("🔍 Search & Filter")
+    filter_values = history.get_filter_values()
     col_search1, col_search2 = st.columns(2)
     
     with col_search1:
-        search_term = st.text_input("Search by JIRA ticket or criteria", placeholder="e.g., BULK-001")
+        search_term = st.text_input(
+            "Search by JIRA ticket or criteria",
+            placeholder='e.g., BULK-001 or "remember me"',
+            help='Words match as prefixes (log finds login); quote text to match an exact phrase'
+        )
     
     with col_search2:
-        provider_filter = st.selectbox(
-            "Filter by Provider",
-            ["All"] + stats["providers_used"]
-        )
+        date_range = st.date_input("Created between", value=(), help="Pick a start and end date")
     
-    # Filter entries
-    filtered_entries = entries
+    col_filter1, col_filter2, col_filter3 = st.columns(3)
     
-    if search_term:
-        filtered_entries = [
-            entry for entry in filtered_entries
-            if search_term.lower() in entry.get('jira_ticket', '').lower() or
-               search_term.lower() in entry.get('acceptance_criteria', '').lower()
-        ]
+    with col_filter1:
+        provider_filter = st.selectbox("Filter by Provider", ["All"] + filter_values["provider"])
+    
+    with col_filter2:
+        component_filter = st.selectbox("Filter by Component", ["All"] + filter_values["component"])
+    
+    with col_filter3:
+        priority_filter = st.selectbox("Filter by Priority", ["All"] + filter_values["priority"])
+    
+    # Search and filter inside the history index
+    date_from = date_to = None
+    if len(date_range) == 2:
+        date_from = datetime.combine(date_range[0], datetime.min.time())
+        date_to = datetime.combine(date_range[1], datetime.min.time()) + timedelta(days=1)
+    filters = dict(
+        query=search_term,
+        provider=None if provider_filter == "All" else provider_filter,
+        component=None if component_filter == "All" else component_filter,
+        priority=None if priority_filter == "All" else priority_filter,
+        date_from=date_from,
+        date_to=date_to
+    )
+    total = history.count(**filters)
     
-    if provider_filter != "All":
-        filtered_entries = [
-            entry for entry in filtered_entries
-            if entry.get('provider', '').lower() == provider_filter.lower()
-        ]
+    # Only the current page is fetched and rendered
+    col_page1, col_page2, col_page3 = st.columns(3)
     
-    st.subheader(f"📋 History ({len(filtered_entries)} entries)")
+    with col_page1:
+        sort_label = st.selectbox("Sort by", list(HISTORY_SORT_OPTIONS))
+    
+    with col_page2:
+        page_size = st.selectbox("Entries per page", [10, 20, 50, 100], index=1)
+    
+    with col_page3:
+        page_count = max(1, (total + page_size - 1) // page_size)
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+    
+    sort_by, descending = HISTORY_SORT_OPTIONS[sort_label]
+    filtered_entries = history.search(
+        **filters, sort_by=sort_by, descending=descending,
+        limit=page_size, offset=(page - 1) * page_size
+    )
+    
+    st.subheader(f"📋 History ({total} entries)")
+    if total:
+        first = (page - 1) * page_size + 1
+        st.caption(f"Showing {first}-{first + len(filtered_entries) - 1} of {total}")
     
     # Display entries
-    for idx, entry in enumerate(filtered_entries):
+    for entry in filtered_entries:
+        entry_id = entry.get('id')
         with st.expander(f"🎫 {entry.get('jira_ticket', 'Unknown')} - {entry.get('priority', 'Medium')} Priority", expanded=False):
             
             # Entry details
@@ -296,7 +429,7 @@ def show_history_page():
                 criteria_text = entry.get('acceptance_criteria', 'No criteria provided')
                 if len(criteria_text) > 200:
                     with st.expander("View Full Acceptance Criteria"):
-                        st.text_area("", criteria_text, height=100, disabled=True, key=f"criteria_{idx}")
+                        st.text_area("", criteria_text, height=100, disabled=True, key=f"criteria_{entry_id}")
                     st.markdown(f"{criteria_text[:200]}...")
                 else:
                     st.markdown(criteria_text)
@@ -309,21 +442,25 @@ def show_history_page():
                 file_path = entry.get('file_path', '')
                 file_name = entry.get('file_name', 'file.xlsx')
                 
-                if os.path.exists(file_path):
+                if not os.path.exists(file_path):
+                    st.error("❌ File not found")
+                elif st.session_state.get(f"prepared_{entry_id}"):
+                    # The file is only read once a download has been requested
                     with open(file_path, 'rb') as file:
                         st.download_button(
                             label=f"📥 Download {file_name}",
                             data=file.read(),
                             file_name=file_name,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            key=f"download_{idx}"
+                            mime=format_for_path(file_name).mime,
+                            key=f"download_{entry_id}"
                         )
-                else:
-                    st.error("❌ File not found")
+                elif st.button(f"📦 Prepare {file_name}", key=f"prepare_{entry_id}", help="Load the file for download"):
+                    st.session_state[f"prepared_{entry_id}"] = True
+                    st.rerun()
                 
                 # Delete button
-                if st.button("🗑️ Delete Entry", key=f"delete_{idx}", help="Delete this history entry"):
-                    if history.delete_entry(entry.get('id')):
+                if st.button("🗑️ Delete Entry", key=f"delete_{entry_id}", help="Delete this history entry"):
+                    if history.delete_entry(entry_id):
                         st.success("Entry deleted successfully!")
                         st.rerun()
                     else:
@@ -0,0 +1,99 @@
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+import pandas as pd
+
+@dataclass
+class _CachedTemplate:
+    mtime_ns: int
+    size: int
+    digest: str
+    frame: pd.DataFrame
+
+class TemplateCache:
+    """In-memory cache of parsed Excel templates
+
+    Entries are keyed by absolute path. A cached template is reused while the
+    file's mtime and size are unchanged; if they change, the content hash is
+    compared before reparsing, so touching or copying a file over itself
+    doesn't cost a parse. Templates passed as bytes (e.g. uploads) are keyed
+    by content hash, keeping the max_uploads most recent. Callers get a copy
+    and may modify it freely.
+    """
+
+    def __init__(self, max_uploads: int = 16):
+        self.hits = 0
+        self.misses = 0
+        self.max_uploads = max_uploads
+        self._entries: Dict[str, _CachedTemplate] = {}
+        self._uploads: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template_path: str) -> pd.DataFrame:
+        """Return the parsed template, reading the file only if it changed"""
+        path = os.path.abspath(template_path)
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._entries.get(path)
+        if cached and (cached.mtime_ns, cached.size) == (stat.st_mtime_ns, stat.st_size):
+            return self._hit(cached)
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            cached = self._entries.get(path)
+            unchanged = cached is not None and cached.digest == digest
+            if unchanged:
+                cached.mtime_ns, cached.size = stat.st_mtime_ns, stat.st_size
+        if unchanged:
+            return self._hit(cached)
+
+        frame = pd.read_excel(io.BytesIO(content))
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = _CachedTemplate(stat.st_mtime_ns, stat.st_size, digest, frame)
+        return frame.copy()
+
+    def get_bytes(self, content: bytes) -> pd.DataFrame:
+        """Return the parsed template for workbook bytes, parsing each distinct content once"""
+        digest = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            frame = self._uploads.get(digest)
+            if frame is not None:
+                self._uploads.move_to_end(digest)
+                self.hits += 1
+                return frame.copy()
+
+        frame = pd.read_excel(io.BytesIO(content))
+        with self._lock:
+            self.misses += 1
+            self._uploads[digest] = frame
+            while len(self._uploads) > self.max_uploads:
+                self._uploads.popitem(last=False)
+        return frame.copy()
+
+    def _hit(self, cached: _CachedTemplate) -> pd.DataFrame:
+        with self._lock:
+            self.hits += 1
+        return cached.frame.copy()
+
+    def invalidate(self, template_path: Optional[str] = None):
+        """Forget one template, or all of them"""
+        with self._lock:
+            if template_path is None:
+                self._entries.clear()
+                self._uploads.clear()
+            else:
+                self._entries.pop(os.path.abspath(template_path), None)
+
+# One cache per process, shared by every generator
+_template_cache = TemplateCache()
+
+def get_template_cache() -> TemplateCache:
+    """Return the process-wide template cache"""
+    return _template_cache
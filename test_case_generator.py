@@ -1,18 +1,169 @@
 import os
-import pandas as pd
-import requests
+import asyncio
+import importlib
 import json
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, List, Dict, Optional, Callable, Iterable, Tuple, Union, BinaryIO
+from dataclasses import dataclass, asdict, replace
 from dotenv import load_dotenv
 import argparse
 import sys
-import google.generativeai as genai
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import ContextVar, copy_context
+from datetime import datetime
 from history_manager import TestCaseHistory
+from response_cache import ResponseCache
+from json_stream import JSONArrayStreamParser
+from criteria_splitter import split_into_sections
+from test_case_schema import (RESPONSE_SCHEMA, STRUCTURED_OUTPUT_INSTRUCTIONS, normalize_test_case,
+                              validate_test_case, repair_prompt)
+from output_writers import (OUTPUT_FORMATS, get_output_format, format_for_path, write_output, to_bytes,
+                            cell_value, dataframe_rows, combined_columns)
+from rate_limiter import RateLimiter, get_rate_limiter
+from retry_policy import RetryPolicy, RetryableError
+from provider_health import get_provider_health
+
+# pandas, numpy, requests, openpyxl and the provider SDKs are imported where
+# they are first used, so the CLI and the UI start without loading them all
+if TYPE_CHECKING:
+    import pandas as pd
+    import requests
+    from similarity_index import SimilarityIndex
 
 # Load environment variables
 load_dotenv()
 
+# Template columns used when no template file is available
+TEMPLATE_COLUMNS = [
+    'Test Key', 'Title', 'Preconditions', 'Priority', 'Test Steps',
+    'Data for Steps', 'Expected Results', 'Jira Story ID', 'Test Type',
+    'Component', 'Release', 'Test Case Status', 'Tags',
+    'Automation Status', 'Automation Key'
+]
+
+# How many times a request waits out HTTP 429 before giving up
+RATE_LIMIT_MAX_WAITS = 5
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 errors from requests, httpx or the Gemini SDK"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'code', None)
+    return status == 429
+
+# Seed used by --deterministic when none is given
+DETERMINISTIC_SEED = 42
+
+# Serializes history writes from concurrent batch workers
+_history_lock = threading.Lock()
+
+# Near-duplicate indexes over history acceptance criteria, one per history database,
+# with the highest entry id indexed so far
+_similarity_indexes: Dict[str, "SimilarityIndex"] = {}
+_similarity_indexed_upto: Dict[str, int] = {}
+_similarity_lock = threading.Lock()
+
+def _get_similarity_index(history: TestCaseHistory) -> "SimilarityIndex":
+    """Return the similarity index for a history database, indexing any new entries"""
+    from similarity_index import SimilarityIndex
+    with _similarity_lock:
+        db_key = os.path.abspath(history.db_file)
+        index = _similarity_indexes.setdefault(db_key, SimilarityIndex())
+        for entry in history.get_entries_since(_similarity_indexed_upto.get(db_key, 0)):
+            if entry.get('acceptance_criteria'):
+                index.add(entry['id'], entry['acceptance_criteria'])
+            _similarity_indexed_upto[db_key] = entry['id']
+    return index
+
+@dataclass
+class HTTPSettings:
+    """Connection pool and timeout settings for provider HTTP clients"""
+    connect_timeout: float = 10.0
+    read_timeout: float = 120.0
+    pool_size: int = 10
+    keepalive_expiry: float = 30.0  # seconds an idle connection is kept; 0 disables keep-alive
+    
+    @classmethod
+    def from_env(cls, prefix: str = "", read_timeout: float = 120.0) -> "HTTPSettings":
+        """Read HTTP_* settings, letting {prefix}_* (e.g. OLLAMA_READ_TIMEOUT) override them"""
+        def get(name, default, cast):
+            value = os.getenv(f"{prefix}_{name}") if prefix else None
+            if value is None:
+                value = os.getenv(f"HTTP_{name}")
+            return cast(value) if value not in (None, "") else default
+        
+        return cls(
+            connect_timeout=get("CONNECT_TIMEOUT", cls.connect_timeout, float),
+            read_timeout=get("READ_TIMEOUT", read_timeout, float),
+            pool_size=get("POOL_SIZE", cls.pool_size, int),
+            keepalive_expiry=get("KEEPALIVE_EXPIRY", cls.keepalive_expiry, float),
+        )
+    
+    @property
+    def timeout(self):
+        """(connect, read) timeout tuple for requests"""
+        return (self.connect_timeout, self.read_timeout)
+
+def _create_session(settings: HTTPSettings) -> "requests.Session":
+    """Create a pooled requests Session that reuses connections across calls"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    class ExpiringHTTPAdapter(HTTPAdapter):
+        """Drops pooled connections that sat idle longer than keepalive_expiry
+
+        urllib3 has no idle timeout, and a connection the server has since
+        closed fails with a reset when reused.
+        """
+        def __init__(self, keepalive_expiry: float, **kwargs):
+            self.keepalive_expiry = keepalive_expiry
+            self._in_flight = 0
+            self._last_used = time.monotonic()
+            self._idle_lock = threading.Lock()
+            super().__init__(**kwargs)
+
+        def send(self, request, **kwargs):
+            with self._idle_lock:
+                if not self._in_flight and time.monotonic() - self._last_used > self.keepalive_expiry:
+                    self.poolmanager.clear()
+                self._in_flight += 1
+            try:
+                return super().send(request, **kwargs)
+            finally:
+                with self._idle_lock:
+                    self._in_flight -= 1
+                    self._last_used = time.monotonic()
+
+    session = requests.Session()
+    adapter = ExpiringHTTPAdapter(settings.keepalive_expiry, pool_connections=settings.pool_size,
+                                  pool_maxsize=settings.pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if settings.keepalive_expiry <= 0:
+        session.headers["Connection"] = "close"
+    return session
+
+def _create_async_client(settings: HTTPSettings, http2: bool = False):
+    """Create an httpx AsyncClient for the async provider path"""
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError("Async generation requires httpx. Install with: pip install 'httpx[http2]'")
+    
+    timeout = httpx.Timeout(settings.read_timeout, connect=settings.connect_timeout)
+    limits = httpx.Limits(
+        max_connections=settings.pool_size,
+        max_keepalive_connections=settings.pool_size if settings.keepalive_expiry > 0 else 0,
+        keepalive_expiry=settings.keepalive_expiry or None
+    )
+    try:
+        return httpx.AsyncClient(http2=http2, timeout=timeout, limits=limits)
+    except ImportError:
+        # HTTP/2 support (the h2 package) is optional; fall back to HTTP/1.1
+        return httpx.AsyncClient(timeout=timeout, limits=limits)
+
 @dataclass
 class TestCaseData:
     """Data structure for test case information"""
@@ -23,26 +174,765 @@ class TestCaseData:
     release: str = "1.0"
     test_type: str = "Functional"
 
+@dataclass
+class GenerationInfo:
+    """How the test cases for one ticket were produced"""
+    source: str = "provider"  # provider, cache, similar or fallback
+    provider: str = ""  # backend that produced the test cases
+    similarity: float = 0.0
+    reused_from: str = ""
+    retries: int = 0  # extra provider calls spent on retries and rate-limit resends
+    hedged: bool = False  # a backup request was raced against the primary
+    latency_saved: float = 0.0  # estimated seconds saved when the backup won the race
+    sections: int = 0  # parts the criteria were split into and generated separately
+    failed_sections: int = 0  # of those, parts that produced no test cases
+    repaired: int = 0  # invalid test cases fixed by a targeted repair request
+    continuations: int = 0  # follow-up requests for the rest of truncated responses
+    partial: bool = False  # output was cut short (interrupted stream or truncated response) and is incomplete
+    retry_deadline: Optional[float] = None  # time.monotonic() after which no provider call is retried
+
+# Details of the most recent generation in the current thread or asyncio task
+_generation_info: ContextVar[Optional[GenerationInfo]] = ContextVar('generation_info', default=None)
+
+def _count_retry():
+    """Record a wasted provider call against the current generation"""
+    info = _generation_info.get()
+    if info is not None:
+        info.retries += 1
+
+def _mark_partial():
+    """Record that the current generation kept incomplete output, so it isn't cached"""
+    info = _generation_info.get()
+    if info is not None:
+        info.partial = True
+
+def _retry_deadline() -> Optional[float]:
+    """Retry deadline of the current generation, shared by its sections and routed backends"""
+    info = _generation_info.get()
+    return info.retry_deadline if info is not None else None
+
+@dataclass
+class BatchResult:
+    """Outcome of a single ticket in a batch generation run"""
+    jira_ticket: str
+    success: bool
+    output_path: str = ""
+    test_case_count: int = 0
+    error: str = ""
+    duration: float = 0.0
+    source: str = ""
+    similarity: float = 0.0
+    reused_from: str = ""
+    retries: int = 0
+    provider: str = ""
+
+@dataclass
+class GenerationResult:
+    """Generated test cases held in memory: the template rows plus the new test cases"""
+    data: "pd.DataFrame"  # the full sheet, as it appears in the workbook
+    workbook: bytes  # serialized .xlsx
+    test_cases: List[Dict]
+    info: Optional[GenerationInfo] = None
+    output_path: str = ""  # set when the workbook was also written to disk
+    
+    def export(self, format_name: str = "xlsx") -> bytes:
+        """The sheet serialized in any output format (see output_writers.OUTPUT_FORMATS)"""
+        if get_output_format(format_name).name == "xlsx":
+            return self.workbook
+        return to_bytes(format_name, list(self.data.columns), dataframe_rows(self.data))
+
+# Accepted column headers (normalized) for batch ticket files
+BATCH_COLUMN_ALIASES = {
+    'jira_ticket': 'jira_ticket', 'jira': 'jira_ticket', 'ticket': 'jira_ticket',
+    'jira_story_id': 'jira_ticket',
+    'priority': 'priority',
+    'acceptance_criteria': 'acceptance_criteria', 'criteria': 'acceptance_criteria',
+    'component': 'component',
+    'release': 'release',
+    'test_type': 'test_type',
+}
+
+def load_tickets(file_path: str, component: str = "Web Application", release: str = "1.0",
+                 test_type: str = "Functional") -> List[TestCaseData]:
+    """Load tickets for batch generation from a CSV or Excel file
+
+    Column headers are matched case-insensitively (e.g. "JIRA Ticket", "jira",
+    "Acceptance Criteria", "criteria"). Missing optional columns fall back to
+    the given defaults.
+    """
+    import pandas as pd
+    if file_path.lower().endswith('.csv'):
+        df = pd.read_csv(file_path, dtype=str)
+    else:
+        df = pd.read_excel(file_path, dtype=str)
+    
+    df = df.rename(columns=lambda c: BATCH_COLUMN_ALIASES.get(
+        str(c).strip().lower().replace(' ', '_').replace('-', '_'), c))
+    
+    missing = [c for c in ('jira_ticket', 'priority', 'acceptance_criteria') if c not in df.columns]
+    if missing:
+        raise ValueError(f"Batch file {file_path} is missing required columns: {', '.join(missing)}")
+    
+    df = df.fillna('')
+    tickets = []
+    for _, row in df.iterrows():
+        if not str(row['jira_ticket']).strip():
+            continue
+        tickets.append(TestCaseData(
+            jira_ticket=str(row['jira_ticket']).strip(),
+            priority=str(row['priority']).strip() or "Medium",
+            acceptance_criteria=str(row['acceptance_criteria']).strip(),
+            component=str(row.get('component', '')).strip() or component,
+            release=str(row.get('release', '')).strip() or release,
+            test_type=str(row.get('test_type', '')).strip() or test_type
+        ))
+    return tickets
+
+class ResponseParseError(RetryableError):
+    """The model response contained no usable test cases"""
+
+class TruncatedResponseError(RetryableError):
+    """The model stopped at its completion token limit
+    
+    test_cases holds the complete test cases parsed before the cut-off, which
+    a continuation request builds on.
+    """
+    
+    def __init__(self, message: str, test_cases: List[Dict]):
+        super().__init__(message)
+        self.test_cases = test_cases
+
+def _merge_test_cases(jira_ticket: str, *groups: Iterable[Dict]) -> List[Dict]:
+    """Concatenate formatted test cases, dropping repeated titles and renumbering Test Keys"""
+    test_cases, titles = [], set()
+    for group in groups:
+        for tc in group:
+            title = str(tc.get('Title', '')).strip().lower()
+            if title and title in titles:
+                continue
+            titles.add(title)
+            test_cases.append({**tc, 'Test Key': f"{jira_ticket}-TC-{len(test_cases) + 1:03d}"})
+    return test_cases
+
 class AIProvider:
-    """Base class for AI providers"""
+    """Base class for AI providers
+    
+    Subclasses implement _generate (and optionally _agenerate), which raise on
+    any failure. generate_test_cases wraps them with the retry policy and only
+    falls back to a placeholder test case once retries are exhausted.
+    """
+    
+    # HTTP/2 lets many concurrent requests share one connection
+    use_http2 = False
+    http = HTTPSettings()
+    
+    # Sampling parameters; None keeps the provider's default. Temperature 0 plus a
+    # fixed seed makes output repeatable, so response cache hits are meaningful.
+    temperature: Optional[float] = None
+    seed: Optional[int] = None
+    
+    # Ask for schema-constrained JSON through the provider's JSON mode, validate
+    # every test case and send only the invalid ones back in a repair request
+    structured_output: bool = False
+    
+    # Completion token limit, also used to budget tokens/min before a request is sent.
+    # A truncated response is continued from its last complete test case, up to
+    # max_continuations times; one cut off before any test case was complete is
+    # re-requested with double the limit, up to max_tokens_limit.
+    max_tokens = 2000
+    max_tokens_limit = 8192
+    max_continuations = 3
+    
+    # Backoff for transient failures: 429/5xx, timeouts, unparseable or truncated output
+    retry_policy = RetryPolicy.from_env()
+    
+    # Extra advice printed when generation fails, e.g. how to start a local server
+    error_hint = ""
+    
+    @property
+    def name(self) -> str:
+        """Short provider name, e.g. groq, ollama or gemini"""
+        return self.display_name.lower()
+    
+    @property
+    def display_name(self) -> str:
+        """Provider name for messages, e.g. Groq"""
+        return self.__class__.__name__.replace('Provider', '')
+    
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Process-wide rate limiter shared by every instance of this provider"""
+        return get_rate_limiter(self.name)
+    
+    def _estimate_tokens(self, prompt: str, max_tokens: Optional[int] = None) -> int:
+        """Upper-bound token estimate for a request (about 4 characters per prompt token)"""
+        return len(prompt) // 4 + (max_tokens or self.max_tokens)
+    
+    def _rate_limited_call(self, call: Callable, tokens: int, consume: Optional[Callable] = None):
+        """Send call() through the rate limiter, waiting out and resending on HTTP 429
+        
+        With consume, the response is passed to it and its result returned while
+        the concurrency slot is still held, so a stream counts until fully read.
+        """
+        limiter = self.rate_limiter
+        for _ in range(RATE_LIMIT_MAX_WAITS):
+            with limiter.limit(tokens):
+                try:
+                    response = call()
+                except Exception as e:
+                    if not _is_rate_limit_error(e):
+                        raise
+                    limiter.on_rate_limited()
+                    _count_retry()
+                    continue
+                
+                headers = getattr(response, 'headers', None)
+                limiter.update_from_headers(headers)
+                if getattr(response, 'status_code', None) == 429:
+                    limiter.on_rate_limited(headers.get('retry-after'))
+                    _count_retry()
+                    response.close()
+                    continue
+                limiter.on_success()
+                return consume(response) if consume is not None else response
+        raise RuntimeError(f"{self.name} rate limit still exceeded after {RATE_LIMIT_MAX_WAITS} waits")
+    
+    async def _arate_limited_call(self, call: Callable, tokens: int):
+        """Async variant of _rate_limited_call; call() returns an awaitable"""
+        limiter = self.rate_limiter
+        for _ in range(RATE_LIMIT_MAX_WAITS):
+            async with limiter.alimit(tokens):
+                try:
+                    response = await call()
+                except Exception as e:
+                    if not _is_rate_limit_error(e):
+                        raise
+                    limiter.on_rate_limited()
+                    _count_retry()
+                    continue
+                
+                headers = getattr(response, 'headers', None)
+                limiter.update_from_headers(headers)
+                if getattr(response, 'status_code', None) == 429:
+                    limiter.on_rate_limited(headers.get('retry-after'))
+                    _count_retry()
+                    await response.aclose()
+                    continue
+                limiter.on_success()
+                return response
+        raise RuntimeError(f"{self.name} rate limit still exceeded after {RATE_LIMIT_MAX_WAITS} waits")
+    
+    def generate_test_cases(self, test_data: TestCaseData,
+                            on_test_case: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Generate formatted test cases for test_data
+        
+        If on_test_case is given the response is streamed and each test case is
+        passed to it as soon as it has been parsed.
+        """
+        self._check_configured()
+        try:
+            return self._generate_with_retries(test_data, on_test_case)
+        except Exception as e:
+            return self._recover(e, test_data, on_test_case)
+    
+    async def agenerate_test_cases(self, test_data: TestCaseData) -> List[Dict]:
+        """Async variant of generate_test_cases"""
+        self._check_configured()
+        try:
+            return await self._agenerate_with_retries(test_data)
+        except Exception as e:
+            return self._recover(e, test_data)
+    
+    def _generate_with_retries(self, test_data: TestCaseData,
+                               on_test_case: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Call _generate under the retry policy, raising the last error if every attempt fails"""
+        budget = {"max_tokens": self.max_tokens}
+        
+        def attempt(number: int) -> List[Dict]:
+            try:
+                return self._generate(test_data, on_test_case, budget["max_tokens"])
+            except TruncatedResponseError as e:
+                if e.test_cases and self._can_continue:
+                    return self._continue(test_data, e.test_cases, budget["max_tokens"])
+                return self._grow_budget(budget, e)
+        
+        return self.retry_policy.call(attempt, on_retry=self._on_retry, deadline=_retry_deadline())
+    
+    async def _agenerate_with_retries(self, test_data: TestCaseData) -> List[Dict]:
+        """Async variant of _generate_with_retries"""
+        budget = {"max_tokens": self.max_tokens}
+        
+        async def attempt(number: int) -> List[Dict]:
+            try:
+                return await self._agenerate(test_data, budget["max_tokens"])
+            except TruncatedResponseError as e:
+                if e.test_cases and self._can_continue:
+                    return await self._acontinue(test_data, e.test_cases, budget["max_tokens"])
+                return self._grow_budget(budget, e)
+        
+        return await self.retry_policy.acall(attempt, on_retry=self._on_retry, deadline=_retry_deadline())
+    
+    @property
+    def _can_continue(self) -> bool:
+        """True if the provider implements _complete, which continuation requests need"""
+        return type(self)._complete is not AIProvider._complete
+    
+    def _continuation_prompt(self, test_data: TestCaseData, test_cases: List[Dict]) -> str:
+        titles = "\n".join(f"- {tc.get('Title', '')}" for tc in test_cases)
+        return self._build_prompt(test_data) + f"""
+Your previous response was cut off at the token limit after these complete test cases:
+{titles}
+
+Return ONLY the remaining test cases, without repeating the ones above, in the same JSON format.
+If none remain, return an empty array.
+"""
+    
+    def _stitch(self, test_cases: List[Dict], items: List[Dict], test_data: TestCaseData,
+                truncated: bool) -> Tuple[List[Dict], bool]:
+        """Append a continuation's test cases; also whether another continuation is worthwhile"""
+        stitched = _merge_test_cases(test_data.jira_ticket, test_cases, self._format_test_cases(items, test_data))
+        return stitched, truncated and len(stitched) > len(test_cases)
+    
+    def _continue(self, test_data: TestCaseData, test_cases: List[Dict], max_tokens: int) -> List[Dict]:
+        """Request the rest of a truncated response, keeping the complete test cases already received"""
+        info = _generation_info.get()
+        truncated = True
+        for _ in range(self.max_continuations):
+            print(f"✂️ {self.display_name} response cut off after {len(test_cases)} test case(s); requesting the rest")
+            if info is not None:
+                info.continuations += 1
+            try:
+                text, truncated = self._complete(self._continuation_prompt(test_data, test_cases), max_tokens)
+            except Exception as e:
+                print(f"⚠️ {self.display_name} continuation failed ({e}); keeping {len(test_cases)} test case(s)")
+                break
+            items, problems = self._extract_items(text)
+            repaired = self._repair(items, problems, test_data) if problems and not truncated else []
+            test_cases, again = self._stitch(test_cases, self._apply_repairs(items, problems, repaired),
+                                             test_data, truncated)
+            if not again:
+                break
+        if truncated:
+            # Still cut off, or the continuation request failed
+            _mark_partial()
+        return test_cases
     
-    def generate_test_cases(self, test_data: TestCaseData) -> List[Dict]:
+    async def _acontinue(self, test_data: TestCaseData, test_cases: List[Dict], max_tokens: int) -> List[Dict]:
+        """Async variant of _continue"""
+        info = _generation_info.get()
+        truncated = True
+        for _ in range(self.max_continuations):
+            print(f"✂️ {self.display_name} response cut off after {len(test_cases)} test case(s); requesting the rest")
+            if info is not None:
+                info.continuations += 1
+            try:
+                text, truncated = await self._acomplete(self._continuation_prompt(test_data, test_cases), max_tokens)
+            except Exception as e:
+                print(f"⚠️ {self.display_name} continuation failed ({e}); keeping {len(test_cases)} test case(s)")
+                break
+            items, problems = self._extract_items(text)
+            repaired = await self._arepair(items, problems, test_data) if problems and not truncated else []
+            test_cases, again = self._stitch(test_cases, self._apply_repairs(items, problems, repaired),
+                                             test_data, truncated)
+            if not again:
+                break
+        if truncated:
+            # Still cut off, or the continuation request failed
+            _mark_partial()
+        return test_cases
+    
+    def _continue_stream(self, test_data: TestCaseData, on_test_case: Callable[[Dict], None],
+                         test_cases: List[Dict], max_tokens: int):
+        """Continue a stream that stopped at the token limit, delivering the extra test cases
+
+        test_cases is replaced by the merged result, so repeated titles in the
+        stream are dropped just as in the non-streaming path.
+        """
+        if not test_cases or not self._can_continue:
+            return
+        # Merging keeps these as a prefix, so whatever follows them was added by the continuation
+        streamed = _merge_test_cases(test_data.jira_ticket, test_cases)
+        merged = self._continue(test_data, streamed, max_tokens)
+        test_cases[:] = merged
+        for tc in merged[len(streamed):]:
+            on_test_case(tc)
+    
+    def _grow_budget(self, budget: Dict, error: TruncatedResponseError) -> List[Dict]:
+        """Double the completion limit for the next attempt after a truncated response
+        
+        Once the limit is already at max_tokens_limit another attempt cannot do
+        better, so the complete test cases from the truncated response are kept.
+        """
+        if budget["max_tokens"] >= self.max_tokens_limit and error.test_cases:
+            _mark_partial()
+            return error.test_cases
+        budget["max_tokens"] = min(budget["max_tokens"] * 2, self.max_tokens_limit)
+        raise error
+    
+    def _on_retry(self, attempt: int, error: Exception, delay: float):
+        _count_retry()
+        print(f"🔁 {self.display_name} attempt {attempt} failed ({error}); retrying in {delay:.1f}s")
+    
+    def _recover(self, error: Exception, test_data: TestCaseData,
+                 on_test_case: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Result after retries are exhausted: partial output of a truncated response, else the fallback"""
+        if isinstance(error, TruncatedResponseError) and error.test_cases:
+            print(f"⚠️ {self.display_name} response still truncated; keeping {len(error.test_cases)} complete test case(s)")
+            _mark_partial()
+            test_cases = error.test_cases
+        else:
+            print(f"Error calling {self.display_name} API: {error}")
+            if self.error_hint:
+                print(self.error_hint)
+            info = _generation_info.get()
+            if info is not None:
+                info.source = "fallback"
+            test_cases = self._fallback_test_cases(test_data)
+        
+        if on_test_case is not None:
+            for tc in test_cases:
+                on_test_case(tc)
+        return test_cases
+    
+    def _check_configured(self):
+        """Raise ValueError if the provider is missing required configuration"""
+    
+    def _generate(self, test_data: TestCaseData, on_test_case: Optional[Callable[[Dict], None]],
+                  max_tokens: int) -> List[Dict]:
+        """Make one generation request, raising on any failure
+        
+        Streams the response when on_test_case is given.
+        """
         raise NotImplementedError
+    
+    async def _agenerate(self, test_data: TestCaseData, max_tokens: int) -> List[Dict]:
+        """Async variant of _generate
+        
+        Providers without a native async client run the blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self._generate, test_data, None, max_tokens)
+    
+    def _get_async_client(self):
+        """Return an AsyncClient bound to the running event loop
+
+        Clients are kept per thread, so threads each running their own event
+        loop (e.g. hedged requests in a batch worker) never share one.
+        """
+        local = self.__dict__.setdefault('_async_local', threading.local())
+        loop = asyncio.get_running_loop()
+        if getattr(local, 'client', None) is None or local.loop is not loop:
+            local.client = _create_async_client(self.http, http2=self.use_http2)
+            local.loop = loop
+        return local.client
+    
+    def _build_prompt(self, test_data: TestCaseData) -> str:
+        """The generation prompt, asking for the response schema in structured mode"""
+        prompt = self._create_prompt(test_data)
+        if self.structured_output:
+            prompt += STRUCTURED_OUTPUT_INSTRUCTIONS
+        return prompt
+    
+    def _complete(self, prompt: str, max_tokens: int) -> Tuple[str, bool]:
+        """Send one prompt and return (text, truncated), raising on any failure"""
+        raise NotImplementedError
+    
+    async def _acomplete(self, prompt: str, max_tokens: int) -> Tuple[str, bool]:
+        """Async variant of _complete"""
+        return await asyncio.to_thread(self._complete, prompt, max_tokens)
+    
+    def _parse_response(self, content: str, test_data: TestCaseData, truncated: bool = False) -> List[Dict]:
+        """Extract test cases from the model output
+        
+        Tolerates prose and code fences around the array, and keeps every valid
+        element even if others are malformed. In structured mode, test cases
+        that fail validation are sent back in one repair request. Raises
+        ResponseParseError if none parse, or TruncatedResponseError if the
+        model hit its token limit.
+        """
+        items, problems = self._extract_items(content)
+        repaired = self._repair(items, problems, test_data) if problems and not truncated else []
+        return self._parsed(self._apply_repairs(items, problems, repaired), content, test_data, truncated)
+    
+    async def _aparse_response(self, content: str, test_data: TestCaseData, truncated: bool = False) -> List[Dict]:
+        """Async variant of _parse_response"""
+        items, problems = self._extract_items(content)
+        repaired = await self._arepair(items, problems, test_data) if problems and not truncated else []
+        return self._parsed(self._apply_repairs(items, problems, repaired), content, test_data, truncated)
+    
+    def _extract_items(self, content: str) -> Tuple[List[Dict], Dict[int, List[str]]]:
+        """Test case objects in the model output, and validation problems by index in structured mode"""
+        parser = JSONArrayStreamParser()
+        items = [tc for tc in parser.feed(content) if isinstance(tc, dict)]
+        if parser.errors:
+            print(f"⚠️ Skipped {parser.errors} malformed test case(s) in {self.__class__.__name__} response")
+        if not self.structured_output:
+            return items, {}
+        items = [normalize_test_case(tc) for tc in items]
+        problems = {i: validate_test_case(tc) for i, tc in enumerate(items)}
+        return items, {i: p for i, p in problems.items() if p}
+    
+    def _parsed(self, items: List[Dict], content: str, test_data: TestCaseData, truncated: bool) -> List[Dict]:
+        if truncated:
+            raise TruncatedResponseError(f"{self.display_name} response was cut off at the token limit",
+                                         self._format_test_cases(items, test_data))
+        if items:
+            return self._format_test_cases(items, test_data)
+        
+        raise ResponseParseError(f"Could not parse test cases from {self.__class__.__name__} response: {content[:200]}...")
+    
+    def _repair_prompt(self, items: List[Dict], problems: Dict[int, List[str]], test_data: TestCaseData) -> str:
+        print(f"🔧 {len(problems)} test case(s) from {self.display_name} failed validation; requesting a repair")
+        return repair_prompt([items[i] for i in problems], list(problems.values()),
+                             test_data.jira_ticket, test_data.acceptance_criteria)
+    
+    def _repair(self, items: List[Dict], problems: Dict[int, List[str]], test_data: TestCaseData) -> List[Any]:
+        """Ask the model to fix only the invalid items; returns the corrected items in order"""
+        try:
+            text, _ = self._complete(self._repair_prompt(items, problems, test_data), self.max_tokens)
+        except Exception as e:
+            print(f"⚠️ {self.display_name} repair request failed: {e}")
+            return []
+        return [normalize_test_case(tc) for tc in JSONArrayStreamParser().feed(text)]
+    
+    async def _arepair(self, items: List[Dict], problems: Dict[int, List[str]], test_data: TestCaseData) -> List[Any]:
+        """Async variant of _repair"""
+        try:
+            text, _ = await self._acomplete(self._repair_prompt(items, problems, test_data), self.max_tokens)
+        except Exception as e:
+            print(f"⚠️ {self.display_name} repair request failed: {e}")
+            return []
+        return [normalize_test_case(tc) for tc in JSONArrayStreamParser().feed(text)]
+    
+    def _apply_repairs(self, items: List[Dict], problems: Dict[int, List[str]], repaired: List[Any]) -> List[Dict]:
+        """items with each invalid one replaced by its repair, or dropped if the repair is missing or invalid"""
+        if not problems:
+            return items
+        fixes = dict(zip(problems, repaired))
+        result = []
+        fixed = 0
+        for i, tc in enumerate(items):
+            if i in problems:
+                tc = fixes.get(i)
+                if tc is None or validate_test_case(tc):
+                    continue
+                fixed += 1
+            result.append(tc)
+        
+        info = _generation_info.get()
+        if info is not None:
+            info.repaired += fixed
+        if fixed < len(problems):
+            print(f"⚠️ Dropped {len(problems) - fixed} invalid test case(s) from {self.display_name}")
+        return result
+    
+    def _collect_stream(self, chunks: Iterable[str], test_data: TestCaseData,
+                        on_test_case: Callable[[Dict], None], test_cases: List[Dict]):
+        """Parse streamed text chunks into test_cases, delivering each one as it completes
+        
+        In structured mode invalid test cases are held back and delivered after
+        the stream ends if a repair request fixes them.
+        """
+        parser = JSONArrayStreamParser()
+        invalid = []
+        
+        def deliver(tc: Dict):
+            formatted = self._format_test_case(tc, test_data, len(test_cases) + 1)
+            test_cases.append(formatted)
+            on_test_case(formatted)
+        
+        for chunk in chunks:
+            for tc in parser.feed(chunk):
+                if not isinstance(tc, dict):
+                    continue
+                if self.structured_output:
+                    tc = normalize_test_case(tc)
+                    if validate_test_case(tc):
+                        invalid.append(tc)
+                        continue
+                deliver(tc)
+        if parser.errors:
+            print(f"⚠️ Skipped {parser.errors} malformed test case(s) in {self.__class__.__name__} response")
+        
+        if invalid:
+            problems = {i: validate_test_case(tc) for i, tc in enumerate(invalid)}
+            for tc in self._apply_repairs(invalid, problems, self._repair(invalid, problems, test_data)):
+                deliver(tc)
+    
+    def _finish_stream(self, test_cases: List[Dict], error: Optional[Exception] = None) -> List[Dict]:
+        """Return streamed test cases
+        
+        Test cases already delivered cannot be taken back, so an interrupted
+        stream keeps them; a failure before any arrived is raised to be retried.
+        """
+        if error is not None:
+            if not test_cases:
+                raise error
+            print(f"⚠️ {self.display_name} stream interrupted after {len(test_cases)} test case(s): {error}")
+            _mark_partial()
+        if not test_cases:
+            raise ResponseParseError(f"Could not parse test cases from streamed {self.__class__.__name__} response")
+        return test_cases
+    
+    def _format_test_cases(self, test_cases: List[Dict], test_data: TestCaseData) -> List[Dict]:
+        """Format test cases to match Excel template columns"""
+        return [self._format_test_case(tc, test_data, i) for i, tc in enumerate(test_cases, 1)]
+    
+    def _format_test_case(self, tc: Dict, test_data: TestCaseData, number: int) -> Dict:
+        """Format a single generated test case as template row number ``number``"""
+        return {
+            'Test Key': f"{test_data.jira_ticket}-TC-{number:03d}",
+            'Title': tc.get('title', ''),
+            'Preconditions': tc.get('preconditions', ''),
+            'Priority': test_data.priority,
+            'Test Steps': tc.get('test_steps', ''),
+            'Data for Steps': tc.get('data_for_steps', ''),
+            'Expected Results': tc.get('expected_results', ''),
+            'Jira Story ID': test_data.jira_ticket,
+            'Test Type': test_data.test_type,
+            'Component': test_data.component,
+            'Release': test_data.release,
+            'Test Case Status': os.getenv('DEFAULT_TEST_STATUS', 'Draft'),
+            'Tags': tc.get('tags', ''),
+            'Automation Status': os.getenv('DEFAULT_AUTOMATION_STATUS', 'Not Automated'),
+            'Automation Key': ''
+        }
+    
+    def _fallback_test_cases(self, test_data: TestCaseData) -> List[Dict]:
+        """Fallback test cases if AI generation fails"""
+        return [{
+            'Test Key': f"{test_data.jira_ticket}-TC-001",
+            'Title': f"Verify {test_data.jira_ticket} acceptance criteria",
+            'Preconditions': "Application is accessible and user is logged in",
+            'Priority': test_data.priority,
+            'Test Steps': "1. Navigate to the feature\n2. Perform the required action\n3. Verify the result",
+            'Data for Steps': "Valid test data",
+            'Expected Results': "Feature works as per acceptance criteria",
+            'Jira Story ID': test_data.jira_ticket,
+            'Test Type': test_data.test_type,
+            'Component': test_data.component,
+            'Release': test_data.release,
+            'Test Case Status': 'Draft',
+            'Tags': 'smoke, regression',
+            'Automation Status': 'Not Automated',
+            'Automation Key': ''
+        }]
+    
+    async def aclose(self):
+        """Close this thread's async HTTP client, if one was created"""
+        local = self.__dict__.get('_async_local')
+        if getattr(local, 'client', None) is not None:
+            await local.client.aclose()
+            local.client = None
 
 class GroqProvider(AIProvider):
     """Groq AI provider (free tier available)"""
     
+    use_http2 = True
+    
     def __init__(self):
         self.api_key = os.getenv('GROQ_API_KEY')
         self.base_url = "https://api.groq.com/openai/v1/chat/completions"
         self.model = os.getenv('DEFAULT_MODEL', 'llama3-8b-8192')
-        
-    def generate_test_cases(self, test_data: TestCaseData) -> List[Dict]:
+        self.http = HTTPSettings.from_env("GROQ")
+        self.session = _create_session(self.http)
+    
+    def _check_configured(self):
         if not self.api_key:
             raise ValueError("GROQ_API_KEY not found in environment variables")
-            
-        prompt = self._create_prompt(test_data)
+    
+    def _generate(self, test_data: TestCaseData, on_test_case: Optional[Callable[[Dict], None]],
+                  max_tokens: int) -> List[Dict]:
+        prompt = self._build_prompt(test_data)
+        
+        if on_test_case is not None and not self.structured_output:
+            headers, payload = self._build_request(prompt, max_tokens)
+            return self._stream_test_cases(test_data, on_test_case, headers, payload,
+                                           self._estimate_tokens(prompt, max_tokens))
+        
+        content, truncated = self._complete(prompt, max_tokens)
+        test_cases = self._parse_response(content, test_data, truncated)
+        if on_test_case is not None:
+            # JSON mode responses aren't streamed, so test cases arrive once complete
+            for tc in test_cases:
+                on_test_case(tc)
+        return test_cases
+    
+    async def _agenerate(self, test_data: TestCaseData, max_tokens: int) -> List[Dict]:
+        content, truncated = await self._acomplete(self._build_prompt(test_data), max_tokens)
+        return await self._aparse_response(content, test_data, truncated)
+    
+    def _complete(self, prompt: str, max_tokens: int) -> Tuple[str, bool]:
+        headers, payload = self._build_request(prompt, max_tokens)
+        tokens = self._estimate_tokens(prompt, max_tokens)
+        response = self._rate_limited_call(
+            lambda: self.session.post(self.base_url, headers=headers, json=payload, timeout=self.http.timeout),
+            tokens
+        )
+        response.raise_for_status()
+        return self._completion_text(response.json(), tokens)
+    
+    async def _acomplete(self, prompt: str, max_tokens: int) -> Tuple[str, bool]:
+        headers, payload = self._build_request(prompt, max_tokens)
+        tokens = self._estimate_tokens(prompt, max_tokens)
+        client = self._get_async_client()
+        response = await self._arate_limited_call(
+            lambda: client.post(self.base_url, headers=headers, json=payload),
+            tokens
+        )
+        response.raise_for_status()
+        return self._completion_text(response.json(), tokens)
+    
+    def _completion_text(self, result: Dict, tokens: int) -> Tuple[str, bool]:
+        """(content, truncated) of a chat completion, refunding unused tokens to the rate limiter"""
+        self.rate_limiter.reconcile(tokens, result.get('usage', {}).get('total_tokens'))
+        choice = result['choices'][0]
+        return choice['message']['content'], choice.get('finish_reason') == 'length'
+    
+    def _stream_test_cases(self, test_data: TestCaseData, on_test_case: Callable[[Dict], None],
+                           headers: Dict, payload: Dict, tokens: int) -> List[Dict]:
+        """Stream the chat completion (server-sent events) and deliver test cases as they parse"""
+        payload = dict(payload, stream=True)
+        truncated = False
+        usage = {}
         
+        def chunks(response):
+            nonlocal truncated, usage
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                message = json.loads(data)
+                # Usage arrives with the final chunk (under x_groq on Groq)
+                usage = message.get('usage') or message.get('x_groq', {}).get('usage') or usage
+                for choice in message.get('choices') or []:
+                    truncated = truncated or choice.get('finish_reason') == 'length'
+                    yield choice.get('delta', {}).get('content') or ''
+        
+        def read(response):
+            with response:
+                response.raise_for_status()
+                self._collect_stream(chunks(response), test_data, on_test_case, test_cases)
+            self.rate_limiter.reconcile(tokens, usage.get('total_tokens'))
+        
+        test_cases = []
+        error = None
+        try:
+            self._rate_limited_call(
+                lambda: self.session.post(self.base_url, headers=headers, json=payload,
+                                          timeout=self.http.timeout, stream=True),
+                tokens, consume=read
+            )
+            if truncated:
+                self._continue_stream(test_data, on_test_case, test_cases, payload["max_tokens"])
+        except Exception as e:
+            error = e
+        
+        return self._finish_stream(test_cases, error)
+    
+    def _build_request(self, prompt: str, max_tokens: Optional[int] = None):
+        """Build request headers and payload for the chat completions endpoint"""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -60,24 +950,14 @@ class GroqProvider(AIProvider):
                     "content": prompt
                 }
             ],
-            "temperature": 0.7,
-            "max_tokens": 2000
+            "temperature": self.temperature if self.temperature is not None else 0.7,
+            "max_tokens": max_tokens or self.max_tokens
         }
-        
-        try:
-            response = requests.post(self.base_url, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            
-            # Parse JSON response
-            test_cases = json.loads(content)
-            return self._format_test_cases(test_cases, test_data)
-            
-        except Exception as e:
-            print(f"Error calling Groq API: {e}")
-            return self._fallback_test_cases(test_data)
+        if self.seed is not None:
+            payload["seed"] = self.seed
+        if self.structured_output:
+            payload["response_format"] = {"type": "json_object"}
+        return headers, payload
     
     def _create_prompt(self, test_data: TestCaseData) -> str:
         return f"""
@@ -108,93 +988,109 @@ Return the response as a JSON array with the following structure:
 Make sure each test case is detailed and actionable.
 """
 
-    def _format_test_cases(self, test_cases: List[Dict], test_data: TestCaseData) -> List[Dict]:
-        """Format test cases to match Excel template columns"""
-        formatted_cases = []
-        
-        for i, tc in enumerate(test_cases, 1):
-            formatted_case = {
-                'Test Key': f"{test_data.jira_ticket}-TC-{i:03d}",
-                'Title': tc.get('title', ''),
-                'Preconditions': tc.get('preconditions', ''),
-                'Priority': test_data.priority,
-                'Test Steps': tc.get('test_steps', ''),
-                'Data for Steps': tc.get('data_for_steps', ''),
-                'Expected Results': tc.get('expected_results', ''),
-                'Jira Story ID': test_data.jira_ticket,
-                'Test Type': test_data.test_type,
-                'Component': test_data.component,
-                'Release': test_data.release,
-                'Test Case Status': os.getenv('DEFAULT_TEST_STATUS', 'Draft'),
-                'Tags': tc.get('tags', ''),
-                'Automation Status': os.getenv('DEFAULT_AUTOMATION_STATUS', 'Not Automated'),
-                'Automation Key': ''
-            }
-            formatted_cases.append(formatted_case)
-            
-        return formatted_cases
-    
-    def _fallback_test_cases(self, test_data: TestCaseData) -> List[Dict]:
-        """Fallback test cases if AI generation fails"""
-        return [{
-            'Test Key': f"{test_data.jira_ticket}-TC-001",
-            'Title': f"Verify {test_data.jira_ticket} acceptance criteria",
-            'Preconditions': "Application is accessible and user is logged in",
-            'Priority': test_data.priority,
-            'Test Steps': "1. Navigate to the feature\n2. Perform the required action\n3. Verify the result",
-            'Data for Steps': "Valid test data",
-            'Expected Results': "Feature works as per acceptance criteria",
-            'Jira Story ID': test_data.jira_ticket,
-            'Test Type': test_data.test_type,
-            'Component': test_data.component,
-            'Release': test_data.release,
-            'Test Case Status': 'Draft',
-            'Tags': 'smoke, regression',
-            'Automation Status': 'Not Automated',
-            'Automation Key': ''
-        }]
-
 class OllamaProvider(AIProvider):
     """Ollama provider (completely free, local)"""
     
+    error_hint = "Make sure Ollama is running locally with: ollama serve"
+    
     def __init__(self):
         self.base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
         self.model = "llama3.2"  # or any model you have installed
+        # Local models can take minutes on CPU, so the default read timeout is longer
+        self.http = HTTPSettings.from_env("OLLAMA", read_timeout=300.0)
+        self.session = _create_session(self.http)
     
-    def generate_test_cases(self, test_data: TestCaseData) -> List[Dict]:
-        prompt = self._create_prompt(test_data)
+    def _generate(self, test_data: TestCaseData, on_test_case: Optional[Callable[[Dict], None]],
+                  max_tokens: int) -> List[Dict]:
+        prompt = self._build_prompt(test_data)
+        
+        if on_test_case is not None:
+            return self._stream_test_cases(test_data, on_test_case, self._build_payload(prompt, max_tokens),
+                                           self._estimate_tokens(prompt, max_tokens))
         
+        content, truncated = self._complete(prompt, max_tokens)
+        return self._parse_response(content, test_data, truncated)
+    
+    async def _agenerate(self, test_data: TestCaseData, max_tokens: int) -> List[Dict]:
+        content, truncated = await self._acomplete(self._build_prompt(test_data), max_tokens)
+        return await self._aparse_response(content, test_data, truncated)
+    
+    def _complete(self, prompt: str, max_tokens: int) -> Tuple[str, bool]:
+        payload = self._build_payload(prompt, max_tokens)
+        response = self._rate_limited_call(
+            lambda: self.session.post(f"{self.base_url}/api/generate", json=payload, timeout=self.http.timeout),
+            self._estimate_tokens(prompt, max_tokens)
+        )
+        response.raise_for_status()
+        result = response.json()
+        return result['response'], result.get('done_reason') == 'length'
+    
+    async def _acomplete(self, prompt: str, max_tokens: int) -> Tuple[str, bool]:
+        payload = self._build_payload(prompt, max_tokens)
+        client = self._get_async_client()
+        response = await self._arate_limited_call(
+            lambda: client.post(f"{self.base_url}/api/generate", json=payload),
+            self._estimate_tokens(prompt, max_tokens)
+        )
+        response.raise_for_status()
+        result = response.json()
+        return result['response'], result.get('done_reason') == 'length'
+    
+    def _stream_test_cases(self, test_data: TestCaseData, on_test_case: Callable[[Dict], None],
+                           payload: Dict, tokens: int) -> List[Dict]:
+        """Stream /api/generate (newline-delimited JSON) and deliver test cases as they parse"""
+        payload = dict(payload, stream=True)
+        truncated = False
+        used = None
+        
+        def chunks(response):
+            nonlocal truncated, used
+            for line in response.iter_lines():
+                if line:
+                    message = json.loads(line)
+                    truncated = truncated or message.get('done_reason') == 'length'
+                    if message.get('done'):
+                        # The final message carries the token counts
+                        used = message.get('prompt_eval_count', 0) + message.get('eval_count', 0)
+                    yield message.get('response', '')
+        
+        def read(response):
+            with response:
+                response.raise_for_status()
+                self._collect_stream(chunks(response), test_data, on_test_case, test_cases)
+            self.rate_limiter.reconcile(tokens, used)
+        
+        test_cases = []
+        error = None
+        try:
+            self._rate_limited_call(
+                lambda: self.session.post(f"{self.base_url}/api/generate", json=payload,
+                                          timeout=self.http.timeout, stream=True),
+                tokens, consume=read
+            )
+            if truncated:
+                self._continue_stream(test_data, on_test_case, test_cases, payload["options"]["num_predict"])
+        except Exception as e:
+            error = e
+        
+        return self._finish_stream(test_cases, error)
+    
+    def _build_payload(self, prompt: str, max_tokens: Optional[int] = None) -> Dict:
+        """Build the /api/generate request payload"""
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False
+            "stream": False,
+            "options": {"num_predict": max_tokens or self.max_tokens}
         }
-        
-        try:
-            response = requests.post(f"{self.base_url}/api/generate", json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result['response']
-            
-            # Try to extract JSON from response
-            try:
-                # Look for JSON in the response
-                start = content.find('[')
-                end = content.rfind(']') + 1
-                if start != -1 and end != 0:
-                    json_content = content[start:end]
-                    test_cases = json.loads(json_content)
-                    return self._format_test_cases(test_cases, test_data)
-            except:
-                pass
-                
-            return self._fallback_test_cases(test_data)
-            
-        except Exception as e:
-            print(f"Error calling Ollama API: {e}")
-            print("Make sure Ollama is running locally with: ollama serve")
-            return self._fallback_test_cases(test_data)
+        if self.temperature is not None:
+            payload["options"]["temperature"] = self.temperature
+        if self.seed is not None:
+            payload["options"]["seed"] = self.seed
+        if self.structured_output:
+            # Ollama constrains decoding to the JSON schema
+            payload["format"] = RESPONSE_SCHEMA
+        return payload
     
     def _create_prompt(self, test_data: TestCaseData) -> str:
         return f"""
@@ -225,52 +1121,6 @@ Return the response as a JSON array with the following structure:
 Make sure each test case is detailed and actionable.
 """
 
-    def _format_test_cases(self, test_cases: List[Dict], test_data: TestCaseData) -> List[Dict]:
-        """Format test cases to match Excel template columns"""
-        formatted_cases = []
-        
-        for i, tc in enumerate(test_cases, 1):
-            formatted_case = {
-                'Test Key': f"{test_data.jira_ticket}-TC-{i:03d}",
-                'Title': tc.get('title', ''),
-                'Preconditions': tc.get('preconditions', ''),
-                'Priority': test_data.priority,
-                'Test Steps': tc.get('test_steps', ''),
-                'Data for Steps': tc.get('data_for_steps', ''),
-                'Expected Results': tc.get('expected_results', ''),
-                'Jira Story ID': test_data.jira_ticket,
-                'Test Type': test_data.test_type,
-                'Component': test_data.component,
-                'Release': test_data.release,
-                'Test Case Status': os.getenv('DEFAULT_TEST_STATUS', 'Draft'),
-                'Tags': tc.get('tags', ''),
-                'Automation Status': os.getenv('DEFAULT_AUTOMATION_STATUS', 'Not Automated'),
-                'Automation Key': ''
-            }
-            formatted_cases.append(formatted_case)
-            
-        return formatted_cases
-    
-    def _fallback_test_cases(self, test_data: TestCaseData) -> List[Dict]:
-        """Fallback test cases if AI generation fails"""
-        return [{
-            'Test Key': f"{test_data.jira_ticket}-TC-001",
-            'Title': f"Verify {test_data.jira_ticket} acceptance criteria",
-            'Preconditions': "Application is accessible and user is logged in",
-            'Priority': test_data.priority,
-            'Test Steps': "1. Navigate to the feature\n2. Perform the required action\n3. Verify the result",
-            'Data for Steps': "Valid test data",
-            'Expected Results': "Feature works as per acceptance criteria",
-            'Jira Story ID': test_data.jira_ticket,
-            'Test Type': test_data.test_type,
-            'Component': test_data.component,
-            'Release': test_data.release,
-            'Test Case Status': 'Draft',
-            'Tags': 'smoke, regression',
-            'Automation Status': 'Not Automated',
-            'Automation Key': ''
-        }]
-
 class GeminiProvider(AIProvider):
     """Google Gemini AI provider"""
     
@@ -280,35 +1130,90 @@ class GeminiProvider(AIProvider):
         
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
-            
+        
+        import google.generativeai as genai
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel(self.model_name)
     
-    def generate_test_cases(self, test_data: TestCaseData) -> List[Dict]:
-        prompt = self._create_prompt(test_data)
+    def _generate(self, test_data: TestCaseData, on_test_case: Optional[Callable[[Dict], None]],
+                  max_tokens: int) -> List[Dict]:
+        prompt = self._build_prompt(test_data)
         
+        if on_test_case is not None:
+            return self._stream_test_cases(test_data, on_test_case, prompt, self._generation_config(max_tokens),
+                                           self._estimate_tokens(prompt, max_tokens))
+        
+        content, truncated = self._complete(prompt, max_tokens)
+        return self._parse_response(content, test_data, truncated)
+    
+    async def _agenerate(self, test_data: TestCaseData, max_tokens: int) -> List[Dict]:
+        content, truncated = await self._acomplete(self._build_prompt(test_data), max_tokens)
+        return await self._aparse_response(content, test_data, truncated)
+    
+    def _complete(self, prompt: str, max_tokens: int) -> Tuple[str, bool]:
+        config = self._generation_config(max_tokens)
+        response = self._rate_limited_call(
+            lambda: self.model.generate_content(prompt, generation_config=config),
+            self._estimate_tokens(prompt, max_tokens)
+        )
+        return response.text, self._is_truncated(response)
+    
+    async def _acomplete(self, prompt: str, max_tokens: int) -> Tuple[str, bool]:
+        config = self._generation_config(max_tokens)
+        response = await self._arate_limited_call(
+            lambda: self.model.generate_content_async(prompt, generation_config=config),
+            self._estimate_tokens(prompt, max_tokens)
+        )
+        return response.text, self._is_truncated(response)
+    
+    def _stream_test_cases(self, test_data: TestCaseData, on_test_case: Callable[[Dict], None],
+                           prompt: str, config: Dict, tokens: int) -> List[Dict]:
+        """Stream generate_content and deliver test cases as they parse"""
+        truncated = False
+        used = None
+
+        def chunks(response):
+            nonlocal truncated, used
+            for chunk in response:
+                # The finish reason and token usage arrive with the last chunk
+                truncated = truncated or self._is_truncated(chunk)
+                used = getattr(getattr(chunk, 'usage_metadata', None), 'total_token_count', None) or used
+                yield chunk.text
+
+        def read(response):
+            self._collect_stream(chunks(response), test_data, on_test_case, test_cases)
+            self.rate_limiter.reconcile(tokens, used)
+
+        test_cases = []
+        error = None
         try:
-            response = self.model.generate_content(prompt)
-            content = response.text
-            
-            # Try to extract JSON from response
-            try:
-                # Look for JSON in the response
-                start = content.find('[')
-                end = content.rfind(']') + 1
-                if start != -1 and end != 0:
-                    json_content = content[start:end]
-                    test_cases = json.loads(json_content)
-                    return self._format_test_cases(test_cases, test_data)
-            except Exception as parse_error:
-                print(f"Error parsing JSON from Gemini response: {parse_error}")
-                print(f"Raw response: {content[:500]}...")
-                
-            return self._fallback_test_cases(test_data)
-            
+            self._rate_limited_call(
+                lambda: self.model.generate_content(prompt, generation_config=config, stream=True),
+                tokens, consume=read
+            )
+            if truncated:
+                self._continue_stream(test_data, on_test_case, test_cases, config["max_output_tokens"])
         except Exception as e:
-            print(f"Error calling Gemini API: {e}")
-            return self._fallback_test_cases(test_data)
+            error = e
+        
+        return self._finish_stream(test_cases, error)
+    
+    @staticmethod
+    def _is_truncated(response) -> bool:
+        """True if generation stopped at max_output_tokens"""
+        candidates = getattr(response, 'candidates', None) or []
+        reason = getattr(candidates[0], 'finish_reason', None) if candidates else None
+        return getattr(reason, 'name', reason) == 'MAX_TOKENS'
+    
+    def _generation_config(self, max_tokens: Optional[int] = None) -> Dict:
+        """Sampling settings for generate_content (the Gemini API has no seed option)"""
+        config = {"max_output_tokens": max_tokens or self.max_tokens}
+        if self.temperature is not None:
+            config["temperature"] = self.temperature
+        if self.structured_output:
+            config["response_mime_type"] = "application/json"
+            config["response_schema"] = RESPONSE_SCHEMA
+        return config
     
     def _create_prompt(self, test_data: TestCaseData) -> str:
         return f"""
@@ -339,150 +1244,859 @@ Return the response as a JSON array with the following structure:
 Make sure each test case is detailed and actionable. Return ONLY the JSON array, no additional text or formatting.
 """
 
-    def _format_test_cases(self, test_cases: List[Dict], test_data: TestCaseData) -> List[Dict]:
-        """Format test cases to match Excel template columns"""
-        formatted_cases = []
+# AI providers by name; register_provider adds more
+PROVIDERS: Dict[str, Union[type, str]] = {}
+
+def register_provider(name: str, provider: Union[type, str]):
+    """Make an AIProvider subclass available to --provider and the router
+
+    provider may be the class itself or a "module:Class" path, which is only
+    imported when the provider is first used.
+    """
+    PROVIDERS[name.lower()] = provider
+
+def get_provider_class(name: str) -> type:
+    """Look up a registered provider class by name (case-insensitive)"""
+    try:
+        provider = PROVIDERS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported provider: {name}")
+    if isinstance(provider, str):
+        module_name, _, class_name = provider.partition(":")
+        provider = getattr(importlib.import_module(module_name), class_name)
+        PROVIDERS[name.lower()] = provider
+    return provider
+
+register_provider("groq", GroqProvider)
+register_provider("ollama", OllamaProvider)
+register_provider("gemini", GeminiProvider)
+
+class RouterProvider(AIProvider):
+    """Routes each request to the healthiest, fastest of several providers
+
+    Backends are ranked by EWMA latency inflated by their error rate, and a
+    backend whose circuit breaker is open is skipped until its cooldown ends.
+    If the chosen backend still fails after its own retries, the request moves
+    on to the next one, so an outage of one provider never stalls a batch.
+    """
+    
+    def __init__(self, provider_names: Optional[List[str]] = None):
+        if provider_names is None:
+            provider_names = os.getenv('ROUTER_PROVIDERS', 'groq,gemini,ollama').split(',')
         
-        for i, tc in enumerate(test_cases, 1):
-            formatted_case = {
-                'Test Key': f"{test_data.jira_ticket}-TC-{i:03d}",
-                'Title': tc.get('title', ''),
-                'Preconditions': tc.get('preconditions', ''),
-                'Priority': test_data.priority,
-                'Test Steps': tc.get('test_steps', ''),
-                'Data for Steps': tc.get('data_for_steps', ''),
-                'Expected Results': tc.get('expected_results', ''),
-                'Jira Story ID': test_data.jira_ticket,
-                'Test Type': test_data.test_type,
-                'Component': test_data.component,
-                'Release': test_data.release,
-                'Test Case Status': os.getenv('DEFAULT_TEST_STATUS', 'Draft'),
-                'Tags': tc.get('tags', ''),
-                'Automation Status': os.getenv('DEFAULT_AUTOMATION_STATUS', 'Not Automated'),
-                'Automation Key': ''
-            }
-            formatted_cases.append(formatted_case)
-            
-        return formatted_cases
+        self.backends: List[AIProvider] = []
+        for name in (n.strip().lower() for n in provider_names if n.strip()):
+            provider_class = get_provider_class(name)
+            try:
+                backend = provider_class()
+                backend._check_configured()
+            except ValueError as e:
+                print(f"⚠️ Skipping {name} in router: {e}")
+                continue
+            self.backends.append(backend)
+        
+        if not self.backends:
+            raise ValueError("No configured providers available for routing")
+        self.model = "+".join(backend.name for backend in self.backends)
     
-    def _fallback_test_cases(self, test_data: TestCaseData) -> List[Dict]:
-        """Fallback test cases if AI generation fails"""
-        return [{
-            'Test Key': f"{test_data.jira_ticket}-TC-001",
-            'Title': f"Verify {test_data.jira_ticket} acceptance criteria",
-            'Preconditions': "Application is accessible and user is logged in",
-            'Priority': test_data.priority,
-            'Test Steps': "1. Navigate to the feature\n2. Perform the required action\n3. Verify the result",
-            'Data for Steps': "Valid test data",
-            'Expected Results': "Feature works as per acceptance criteria",
-            'Jira Story ID': test_data.jira_ticket,
-            'Test Type': test_data.test_type,
-            'Component': test_data.component,
-            'Release': test_data.release,
-            'Test Case Status': 'Draft',
-            'Tags': 'smoke, regression',
-            'Automation Status': 'Not Automated',
-            'Automation Key': ''
-        }]
+    # Sampling parameters are forwarded to every backend
+    @property
+    def temperature(self) -> Optional[float]:
+        return self.backends[0].temperature
+    
+    @temperature.setter
+    def temperature(self, value: Optional[float]):
+        for backend in self.backends:
+            backend.temperature = value
+    
+    @property
+    def seed(self) -> Optional[int]:
+        return self.backends[0].seed
+    
+    @seed.setter
+    def seed(self, value: Optional[int]):
+        for backend in self.backends:
+            backend.seed = value
+    
+    @property
+    def structured_output(self) -> bool:
+        return self.backends[0].structured_output
+    
+    @structured_output.setter
+    def structured_output(self, value: bool):
+        for backend in self.backends:
+            backend.structured_output = value
+    
+    def _ranked(self) -> List[AIProvider]:
+        """Backends by routing score, lowest first; configured order breaks ties"""
+        return sorted(self.backends, key=lambda backend: get_provider_health(backend.name).score())
+    
+    def _generate_with_retries(self, test_data: TestCaseData,
+                               on_test_case: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        errors = []
+        for backend in self._ranked():
+            health = get_provider_health(backend.name)
+            if not health.acquire():
+                continue
+            start = time.perf_counter()
+            try:
+                test_cases = backend._generate_with_retries(test_data, on_test_case)
+            except Exception as e:
+                health.record_failure()
+                errors.append(f"{backend.display_name}: {e}")
+                print(f"⚠️ {backend.display_name} failed ({e}); routing to the next provider")
+                continue
+            health.record_success(time.perf_counter() - start)
+            self._record_backend(backend)
+            return test_cases
+        raise RuntimeError("; ".join(errors) or "every provider circuit is open")
+    
+    async def _agenerate_with_retries(self, test_data: TestCaseData) -> List[Dict]:
+        errors = []
+        for backend in self._ranked():
+            health = get_provider_health(backend.name)
+            if not health.acquire():
+                continue
+            start = time.perf_counter()
+            try:
+                test_cases = await backend._agenerate_with_retries(test_data)
+            except Exception as e:
+                health.record_failure()
+                errors.append(f"{backend.display_name}: {e}")
+                print(f"⚠️ {backend.display_name} failed ({e}); routing to the next provider")
+                continue
+            health.record_success(time.perf_counter() - start)
+            self._record_backend(backend)
+            return test_cases
+        raise RuntimeError("; ".join(errors) or "every provider circuit is open")
+    
+    def _record_backend(self, backend: AIProvider):
+        info = _generation_info.get()
+        if info is not None:
+            info.provider = backend.name
+    
+    def _create_prompt(self, test_data: TestCaseData) -> str:
+        return self.backends[0]._create_prompt(test_data)
+    
+    async def aclose(self):
+        for backend in self.backends:
+            await backend.aclose()
 
 class TestCaseGenerator:
     """Main test case generator class"""
     
-    def __init__(self, provider: str = "groq"):
+    def __init__(self, provider: str = "groq", use_cache: bool = True, temperature: Optional[float] = None,
+                 seed: Optional[int] = None, cache: Optional[ResponseCache] = None,
+                 reuse_threshold: Optional[float] = None, hedge_provider: Optional[str] = None,
+                 hedge_percentile: Optional[float] = None, split_criteria: Optional[bool] = None,
+                 structured_output: Optional[bool] = None):
         self.provider = self._get_provider(provider)
+        
+        # Race a second provider when the first is slower than its usual latency
+        self.hedge_provider = self._get_provider(hedge_provider) if hedge_provider else None
+        if self.hedge_provider is not None:
+            # Racing an unconfigured backup would only count a failure against it
+            self.hedge_provider._check_configured()
+        if hedge_percentile is None:
+            hedge_percentile = float(os.getenv('HEDGE_PERCENTILE', '95'))
+        self.hedge_percentile = hedge_percentile
+        self.hedge_default_delay = float(os.getenv('HEDGE_DEFAULT_DELAY', '10'))
+        
+        if temperature is None and os.getenv('DEFAULT_TEMPERATURE'):
+            temperature = float(os.getenv('DEFAULT_TEMPERATURE'))
+        if seed is None and os.getenv('DEFAULT_SEED'):
+            seed = int(os.getenv('DEFAULT_SEED'))
+        if structured_output is None:
+            structured_output = os.getenv('STRUCTURED_OUTPUT', 'false').lower() in ('1', 'true', 'yes')
+        for ai_provider in (self.provider, self.hedge_provider):
+            if ai_provider is None:
+                continue
+            if temperature is not None:
+                ai_provider.temperature = temperature
+            if seed is not None:
+                ai_provider.seed = seed
+            ai_provider.structured_output = structured_output
+        
+        # With use_cache=False lookups are bypassed, but fresh results still refresh the cache
+        self.use_cache = use_cache
+        self.cache = cache if cache is not None else ResponseCache()
+        
+        # Reuse test cases from a past ticket whose criteria are at least this similar (0-1)
+        if reuse_threshold is None and os.getenv('SIMILARITY_REUSE_THRESHOLD'):
+            reuse_threshold = float(os.getenv('SIMILARITY_REUSE_THRESHOLD'))
+        self.reuse_threshold = reuse_threshold
+        
+        # Split long criteria into sections generated in parallel, then merge the results
+        if split_criteria is None:
+            split_criteria = os.getenv('SPLIT_CRITERIA', 'false').lower() in ('1', 'true', 'yes')
+        self.split_criteria = split_criteria
+        self.split_min_chars = int(os.getenv('SPLIT_CRITERIA_MIN_CHARS', '800'))
+        self.section_jobs = max(1, int(os.getenv('SPLIT_CRITERIA_JOBS', '4')))
     
     def _get_provider(self, provider_name: str) -> AIProvider:
         """Get AI provider based on name"""
-        if provider_name.lower() == "groq":
-            return GroqProvider()
-        elif provider_name.lower() == "ollama":
-            return OllamaProvider()
-        elif provider_name.lower() == "gemini":
-            return GeminiProvider()
-        else:
-            raise ValueError(f"Unsupported provider: {provider_name}")
+        if provider_name.lower() in ("auto", "router"):
+            return RouterProvider()
+        elif "," in provider_name:
+            return RouterProvider(provider_name.split(","))
+        return get_provider_class(provider_name)()
     
-    def generate_from_template(self, template_path: str, output_path: str, test_data: TestCaseData, record_history: bool = True) -> bool:
-        """Generate test cases and save to Excel file"""
+    def generate_from_template(self, template_path: str, output_path: str, test_data: TestCaseData, record_history: bool = True,
+                               on_test_case: Optional[Callable[[Dict], None]] = None) -> bool:
+        """Generate test cases and save to Excel file
+
+        Pass on_test_case to stream the provider response and receive each test
+        case as soon as it is parsed.
+        """
         try:
-            # Read existing template
-            if os.path.exists(template_path):
-                df_template = pd.read_excel(template_path)
-                print(f"Loaded template with {len(df_template)} existing rows")
+            self._generate_to_file(template_path, output_path, test_data, record_history, on_test_case)
+            return True
+        except Exception as e:
+            print(f"Error generating test cases: {e}")
+            return False
+    
+    def _generate_to_file(self, template_path: str, output_path: str, test_data: TestCaseData, record_history: bool = True,
+                          on_test_case: Optional[Callable[[Dict], None]] = None,
+                          history: Optional[TestCaseHistory] = None) -> int:
+        """Generate test cases into output_path and return how many were written
+
+        Raises on failure so callers can report the reason.
+        """
+        df_template = self._load_template(template_path)
+        
+        # Generate test cases using AI
+        test_cases = self.generate_test_cases(test_data, on_test_case)
+        
+        return self._save_test_cases(df_template, test_cases, output_path, test_data, record_history, history)
+    
+    async def __aenter__(self) -> "TestCaseGenerator":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the async HTTP clients of this event loop, for the primary and any hedge provider"""
+        await self.provider.aclose()
+        if self.hedge_provider is not None:
+            await self.hedge_provider.aclose()
+    
+    async def agenerate_from_template(self, template_path: str, output_path: str, test_data: TestCaseData, record_history: bool = True) -> bool:
+        """Async variant of generate_from_template
+
+        The provider call runs on the event loop; Excel I/O runs in a worker thread.
+        HTTP clients stay open for further calls on the same loop, so use the
+        generator as ``async with`` (or await aclose()) before the loop ends.
+        """
+        try:
+            await self._agenerate_to_file(template_path, output_path, test_data, record_history)
+            return True
+        except Exception as e:
+            print(f"Error generating test cases: {e}")
+            return False
+    
+    async def _agenerate_to_file(self, template_path: str, output_path: str, test_data: TestCaseData, record_history: bool = True,
+                                 history: Optional[TestCaseHistory] = None) -> int:
+        df_template = await asyncio.to_thread(self._load_template, template_path)
+        
+        test_cases = await self.agenerate_test_cases(test_data)
+        
+        return await asyncio.to_thread(self._save_test_cases, df_template, test_cases, output_path, test_data,
+                                       record_history, history)
+    
+    @property
+    def last_generation_info(self) -> Optional[GenerationInfo]:
+        """Details of the most recent generation in the current thread or asyncio task"""
+        return _generation_info.get()
+    
+    def _new_generation_info(self) -> GenerationInfo:
+        # RETRY_MAX_TOTAL_SECONDS caps retries across every call made for one ticket
+        return GenerationInfo(provider=self.provider.name, retry_deadline=self.provider.retry_policy.deadline())
+    
+    def generate_test_cases(self, test_data: TestCaseData,
+                            on_test_case: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Generate test cases, reusing cached or near-duplicate results where possible"""
+        _generation_info.set(self._new_generation_info())
+        sections = self._sections(test_data)
+        key = self._cache_key(test_data, sections)
+        reused = self._lookup(test_data, key)
+        if reused is not None:
+            if on_test_case is not None:
+                for tc in reused:
+                    on_test_case(tc)
+            return reused
+        
+        print(f"Generating test cases for {test_data.jira_ticket} using AI...")
+        if sections:
+            # Sections finish in any order, so results are delivered once merged and renumbered
+            test_cases = self._generate_sections(test_data, sections)
+            if on_test_case is not None:
+                for tc in test_cases:
+                    on_test_case(tc)
+        elif self.hedge_provider is not None:
+            # Hedged requests race on an event loop, so results arrive all at once
+            test_cases = asyncio.run(self._run_hedged(test_data))
+            if on_test_case is not None:
+                for tc in test_cases:
+                    on_test_case(tc)
+        else:
+            start = time.perf_counter()
+            if on_test_case is not None:
+                test_cases = self.provider.generate_test_cases(test_data, on_test_case)
             else:
-                # Create new dataframe with template columns
-                columns = [
-                    'Test Key', 'Title', 'Preconditions', 'Priority', 'Test Steps',
-                    'Data for Steps', 'Expected Results', 'Jira Story ID', 'Test Type',
-                    'Component', 'Release', 'Test Case Status', 'Tags',
-                    'Automation Status', 'Automation Key'
-                ]
-                df_template = pd.DataFrame(columns=columns)
-                print("Created new template structure")
-            
-            # Generate test cases using AI
-            print("Generating test cases using AI...")
-            test_cases = self.provider.generate_test_cases(test_data)
-            
-            if not test_cases:
-                print("No test cases generated")
-                return False
-            
-            # Convert to DataFrame
-            df_new_cases = pd.DataFrame(test_cases)
-            
-            # Append to existing template
-            df_combined = pd.concat([df_template, df_new_cases], ignore_index=True)
-            
-            # Save to Excel
-            df_combined.to_excel(output_path, index=False)
+                test_cases = self.provider.generate_test_cases(test_data)
+            self._record_latency(time.perf_counter() - start)
+        self._store_in_cache(key, test_cases, test_data)
+        return test_cases
+    
+    def _sections(self, test_data: TestCaseData) -> Optional[List[str]]:
+        """The criteria split into independent sections, or None to generate them in one request"""
+        if not self.split_criteria or len(test_data.acceptance_criteria) < self.split_min_chars:
+            return None
+        sections = split_into_sections(test_data.acceptance_criteria)
+        return sections if len(sections) > 1 else None
+    
+    def _generate_sections(self, test_data: TestCaseData, sections: List[str]) -> List[Dict]:
+        """Generate each section in a worker thread and merge the results"""
+        # Sections call the retry loop directly, so fail fast here like generate_test_cases does
+        self.provider._check_configured()
+        print(f"🧩 Split {test_data.jira_ticket} into {len(sections)} sections")
+        section_data = [replace(test_data, acceptance_criteria=section) for section in sections]
+        with ThreadPoolExecutor(max_workers=min(self.section_jobs, len(sections))) as executor:
+            # Workers share this generation's info, so retries across sections are counted
+            futures = [executor.submit(copy_context().run, self._generate_section, data) for data in section_data]
+            results = [future.result() for future in futures]
+        return self._merge_sections(test_data, results)
+    
+    async def _agenerate_sections(self, test_data: TestCaseData, sections: List[str]) -> List[Dict]:
+        """Async variant of _generate_sections, with at most section_jobs requests in flight"""
+        self.provider._check_configured()
+        print(f"🧩 Split {test_data.jira_ticket} into {len(sections)} sections")
+        semaphore = asyncio.Semaphore(self.section_jobs)
+        
+        async def generate(section: str) -> Tuple[List[Dict], Optional[Exception]]:
+            async with semaphore:
+                data = replace(test_data, acceptance_criteria=section)
+                try:
+                    return await self.provider._agenerate_with_retries(data), None
+                except Exception as e:
+                    return self._section_failure(e)
+        
+        results = await asyncio.gather(*(generate(section) for section in sections))
+        return self._merge_sections(test_data, results)
+    
+    def _generate_section(self, test_data: TestCaseData) -> Tuple[List[Dict], Optional[Exception]]:
+        """(test cases, error) for one section; errors are returned so the other sections are kept"""
+        try:
+            return self.provider._generate_with_retries(test_data), None
+        except Exception as e:
+            return self._section_failure(e)
+    
+    @staticmethod
+    def _section_failure(error: Exception) -> Tuple[List[Dict], Optional[Exception]]:
+        # A truncated section still contributes its complete test cases
+        if isinstance(error, TruncatedResponseError) and error.test_cases:
+            _mark_partial()
+            return error.test_cases, None
+        return [], error
+    
+    def _merge_sections(self, test_data: TestCaseData,
+                        results: List[Tuple[List[Dict], Optional[Exception]]]) -> List[Dict]:
+        """Concatenate section results in order, dropping repeated titles and renumbering Test Keys
+        
+        Falls back to the provider's placeholder only if every section failed.
+        """
+        info = _generation_info.get()
+        info.sections = len(results)
+        errors = []
+        for number, (_, error) in enumerate(results, 1):
+            if error is not None:
+                errors.append(f"section {number}: {error}")
+                print(f"⚠️ Section {number} of {test_data.jira_ticket} failed: {error}")
+        test_cases = _merge_test_cases(test_data.jira_ticket, *(section_cases for section_cases, _ in results))
+        
+        info.failed_sections = len(errors)
+        if not test_cases:
+            return self.provider._recover(RuntimeError("; ".join(errors)), test_data)
+        return test_cases
+    
+    async def agenerate_test_cases(self, test_data: TestCaseData) -> List[Dict]:
+        """Async variant of generate_test_cases; see agenerate_from_template about closing clients"""
+        _generation_info.set(self._new_generation_info())
+        sections = self._sections(test_data)
+        key = self._cache_key(test_data, sections)
+        reused = await asyncio.to_thread(self._lookup, test_data, key)
+        if reused is not None:
+            return reused
+        
+        print(f"Generating test cases for {test_data.jira_ticket} using AI...")
+        if sections:
+            test_cases = await self._agenerate_sections(test_data, sections)
+        elif self.hedge_provider is not None:
+            test_cases = await self._ahedged_generate(test_data)
+        else:
+            start = time.perf_counter()
+            test_cases = await self.provider.agenerate_test_cases(test_data)
+            self._record_latency(time.perf_counter() - start)
+        await asyncio.to_thread(self._store_in_cache, key, test_cases, test_data)
+        return test_cases
+    
+    async def _run_hedged(self, test_data: TestCaseData) -> List[Dict]:
+        """Hedged generation on a short-lived event loop, closing its HTTP clients afterwards"""
+        try:
+            return await self._ahedged_generate(test_data)
+        finally:
+            await self.aclose()
+    
+    def _record_latency(self, elapsed: float):
+        """Record an unhedged primary call in its health tracker, so hedging has latencies to go on"""
+        if isinstance(self.provider, RouterProvider):
+            # A router records each backend it calls itself
+            return
+        health = get_provider_health(self.provider.name)
+        if _generation_info.get().source == "fallback":
+            health.record_failure()
+        else:
+            health.record_success(elapsed)
+    
+    def _hedge_delay(self) -> float:
+        """Seconds to wait for the primary before hedging: its hedge_percentile latency"""
+        delay = get_provider_health(self.provider.name).percentile(self.hedge_percentile)
+        return delay if delay is not None else self.hedge_default_delay
+    
+    async def _ahedged_generate(self, test_data: TestCaseData) -> List[Dict]:
+        """Race the primary provider against the hedge provider
+
+        The hedge request is only sent if the primary fails or is still running
+        after _hedge_delay(). The first valid result wins and the other request
+        is cancelled.
+        """
+        primary, backup = self.provider, self.hedge_provider
+        # Both race through the retry loop directly, bypassing generate_test_cases' check
+        primary._check_configured()
+        delay = self._hedge_delay()
+        start = time.perf_counter()
+        tasks = {asyncio.create_task(self._timed_generate(primary, test_data)): primary}
+        errors = []
+        
+        def hedge():
+            _generation_info.get().hedged = True
+            tasks[asyncio.create_task(self._timed_generate(backup, test_data))] = backup
+        
+        try:
+            while tasks:
+                hedged = _generation_info.get().hedged
+                timeout = None if hedged else max(0.0, delay - (time.perf_counter() - start))
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                if not done:
+                    print(f"⏱️ {primary.display_name} slower than {delay:.1f}s; hedging with {backup.display_name}")
+                    hedge()
+                    continue
+                
+                for task in done:
+                    ai_provider = tasks.pop(task)
+                    try:
+                        test_cases = task.result()
+                    except Exception as e:
+                        errors.append(f"{ai_provider.display_name}: {e}")
+                        print(f"⚠️ {ai_provider.display_name} failed ({e})")
+                        if ai_provider is primary and not _generation_info.get().hedged:
+                            hedge()
+                        continue
+                    
+                    self._record_hedge_winner(ai_provider, time.perf_counter() - start,
+                                              primary_running=primary in tasks.values())
+                    return test_cases
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return primary._recover(RuntimeError("; ".join(errors)), test_data)
+    
+    async def _timed_generate(self, ai_provider: AIProvider, test_data: TestCaseData) -> List[Dict]:
+        """Generate with ai_provider, recording latency and failures in its health tracker"""
+        health = get_provider_health(ai_provider.name)
+        start = time.perf_counter()
+        try:
+            test_cases = await ai_provider._agenerate_with_retries(test_data)
+        except asyncio.CancelledError:
+            # Lost the race: it would have taken at least this long
+            health.record_censored(time.perf_counter() - start)
+            raise
+        except Exception:
+            health.record_failure()
+            raise
+        health.record_success(time.perf_counter() - start)
+        return test_cases
+    
+    def _record_hedge_winner(self, winner: AIProvider, elapsed: float, primary_running: bool):
+        """Record which provider won a hedged request and the latency the hedge saved"""
+        info = _generation_info.get()
+        if not isinstance(winner, RouterProvider):
+            # A router records the backend that actually served the request itself
+            info.provider = winner.name
+        if not info.hedged:
+            return
+        
+        saved = 0.0
+        if primary_running:
+            # The primary was still running after elapsed seconds; estimate how long it would have
+            # taken from its past calls that ran longer, or else its hedge_percentile latency
+            health = get_provider_health(self.provider.name)
+            expected = health.mean_latency_above(elapsed)
+            if expected is None:
+                expected = health.percentile(self.hedge_percentile)
+            saved = max(0.0, expected - elapsed) if expected is not None else 0.0
+        info.latency_saved = saved
+        saved_note = f", saving ~{saved:.1f}s" if saved else ""
+        print(f"🏁 {winner.display_name} won the hedged request in {elapsed:.1f}s{saved_note}")
+    
+    def _lookup(self, test_data: TestCaseData, key: str) -> Optional[List[Dict]]:
+        """Return test cases from the response cache or a near-duplicate past ticket"""
+        # Bypassing the cache means always calling the provider, so it skips reuse too
+        if not self.use_cache:
+            return None
+        
+        info = _generation_info.get()
+        cached = self.cache.get(key)
+        if cached is not None:
+            info.source = "cache"
+            print(f"♻️ Using cached test cases for {test_data.jira_ticket}")
+            return cached
+        
+        if self.reuse_threshold is None:
+            return None
+        try:
+            history = TestCaseHistory()
+            index = _get_similarity_index(history)
+            candidates = index.query(test_data.acceptance_criteria, self.reuse_threshold)
+        except Exception as e:
+            print(f"⚠️ Warning: Similarity lookup failed: {e}")
+            return None
+        
+        for entry_id, score in candidates:
+            # A candidate that can't be read shouldn't stop the next one from being tried
+            try:
+                entry = history.get_entry_by_id(entry_id)
+                test_cases = self._adapt_history_entry(entry, test_data) if entry else None
+            except Exception as e:
+                print(f"⚠️ Warning: Could not reuse history entry {entry_id}: {e}")
+                continue
+            if test_cases:
+                info.source = "similar"
+                info.similarity = score
+                info.reused_from = entry['jira_ticket']
+                print(f"♻️ Reusing test cases from {entry['jira_ticket']} for {test_data.jira_ticket} "
+                      f"(similarity {score:.2f})")
+                return test_cases
+        return None
+    
+    def _adapt_history_entry(self, entry: Dict, test_data: TestCaseData) -> Optional[List[Dict]]:
+        """Load a past ticket's test cases and rewrite them for test_data"""
+        file_path = entry.get('file_path', '')
+        if not os.path.exists(file_path):
+            return None
+        
+        # Generated files may be in any output format
+        read = format_for_path(file_path).read
+        if read is None:
+            return None
+        old_ticket = entry['jira_ticket']
+        columns, rows = read(file_path)
+        rows = [{k: ('' if cell_value(v) is None else v) for k, v in row.items()} for row in rows]
+        # Skip template rows that were copied into the output file
+        if 'Jira Story ID' in columns:
+            rows = [row for row in rows if str(row.get('Jira Story ID')) == old_ticket]
+        
+        # Don't propagate the generic placeholder from a failed generation
+        if not rows or (len(rows) == 1 and rows[0].get('Title') == f"Verify {old_ticket} acceptance criteria"):
+            return None
+        
+        adapted = []
+        for i, row in enumerate(rows, 1):
+            case = {column: row.get(column, '') for column in TEMPLATE_COLUMNS}
+            for column in ('Title', 'Preconditions', 'Test Steps', 'Data for Steps', 'Expected Results', 'Tags'):
+                case[column] = str(case[column]).replace(old_ticket, test_data.jira_ticket)
+            case.update({
+                'Test Key': f"{test_data.jira_ticket}-TC-{i:03d}",
+                'Priority': test_data.priority,
+                'Jira Story ID': test_data.jira_ticket,
+                'Test Type': test_data.test_type,
+                'Component': test_data.component,
+                'Release': test_data.release
+            })
+            adapted.append(case)
+        return adapted
+    
+    def _cache_key(self, test_data: TestCaseData, sections: Optional[List[str]] = None) -> str:
+        """Cache key for the rendered prompt, model and sampling parameters"""
+        provider = self.provider
+        # Split generations are cached separately from single-request ones
+        extra = {"sections": sections} if sections else {}
+        return ResponseCache.make_key(
+            provider=provider.__class__.__name__,
+            model=getattr(provider, 'model_name', None) or provider.model,
+            prompt=provider._build_prompt(test_data),
+            temperature=provider.temperature,
+            seed=provider.seed,
+            # Fields copied into the formatted rows but not part of the prompt
+            ticket=asdict(test_data),
+            **extra
+        )
+    
+    def _store_in_cache(self, key: str, test_cases: List[Dict], test_data: TestCaseData):
+        """Cache a provider result unless it is the generic fallback or incomplete"""
+        if not test_cases or test_cases == self.provider._fallback_test_cases(test_data):
+            return
+        info = _generation_info.get()
+        if info is not None and (info.failed_sections or info.partial):
+            return
+        try:
+            self.cache.set(key, test_cases)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not write response cache: {e}")
+    
+    def _load_template(self, template: Union[str, bytes, BinaryIO]) -> "pd.DataFrame":
+        """Read the Excel template, or create an empty one with the template columns
+
+        template is a file path, the workbook bytes or a binary file-like object.
+        """
+        import pandas as pd
+        from template_cache import get_template_cache
+        if not isinstance(template, str):
+            content = template if isinstance(template, bytes) else template.read()
+            df_template = get_template_cache().get_bytes(content)
+            print(f"Loaded template with {len(df_template)} existing rows")
+        elif os.path.exists(template):
+            # Parsed once per process and reused until the file changes
+            df_template = get_template_cache().get(template)
+            print(f"Loaded template with {len(df_template)} existing rows")
+        else:
+            # Create new dataframe with template columns
+            df_template = pd.DataFrame(columns=TEMPLATE_COLUMNS)
+            print("Created new template structure")
+        return df_template
+    
+    def _save_test_cases(self, df_template: "pd.DataFrame", test_cases: List[Dict], output_path: str,
+                         test_data: TestCaseData, record_history: bool = True,
+                         history: Optional[TestCaseHistory] = None) -> int:
+        """Append generated test cases to the template, write the workbook and record history
+
+        Pass history to record into an open TestCaseHistory (e.g. one in a batch() block).
+        """
+        if not test_cases:
+            raise RuntimeError("No test cases generated")
+        
+        # Stream the template rows and new test cases straight into the output file,
+        # in the format matching its extension
+        columns = combined_columns(list(df_template.columns), test_cases)
+        write_output(output_path, columns, dataframe_rows(df_template), test_cases)
+        print(f"Generated {len(test_cases)} test cases and saved to {output_path}")
+        
+        # Record in history if requested
+        if record_history:
+            self._record_history(output_path, test_data, history)
+        
+        return len(test_cases)
+    
+    def _record_history(self, output_path: str, test_data: TestCaseData, history: Optional[TestCaseHistory] = None):
+        """Add a generated workbook to history; failures only print a warning"""
+        try:
+            info = _generation_info.get()
+            provider_name = (info and info.provider) or self.provider.name
+            with _history_lock:
+                history = history or TestCaseHistory()
+                history.add_entry(
+                    jira_ticket=test_data.jira_ticket,
+                    priority=test_data.priority,
+                    acceptance_criteria=test_data.acceptance_criteria,
+                    file_path=output_path,
+                    provider=provider_name,
+                    component=test_data.component,
+                    test_type=test_data.test_type
+                )
+            print(f"📝 Recorded in history: {output_path}")
+        except Exception as e:
+            print(f"⚠️ Warning: Could not record history: {e}")
+    
+    def generate_result(self, test_data: TestCaseData, template: Union[str, bytes, BinaryIO] = "Testcases_template.xlsx",
+                        output_path: Optional[str] = None, record_history: bool = True,
+                        on_test_case: Optional[Callable[[Dict], None]] = None) -> GenerationResult:
+        """Generate test cases and return the sheet and workbook bytes in memory
+
+        template may be a path, workbook bytes or a binary file-like object (e.g.
+        an upload). If output_path is given the workbook is also written there
+        (in the format matching its extension) and, with record_history, added
+        to history. Raises on failure.
+        """
+        df_template = self._load_template(template)
+        test_cases = self.generate_test_cases(test_data, on_test_case)
+        if not test_cases:
+            raise RuntimeError("No test cases generated")
+        
+        import pandas as pd
+        columns = combined_columns(list(df_template.columns), test_cases)
+        workbook = to_bytes("xlsx", columns, dataframe_rows(df_template), test_cases)
+        data = pd.concat([df_template, pd.DataFrame(test_cases)], ignore_index=True)[columns]
+        result = GenerationResult(data, workbook, test_cases, self.last_generation_info)
+        
+        if output_path:
+            with open(output_path, 'wb') as f:
+                f.write(result.export(format_for_path(output_path).name))
+            result.output_path = output_path
             print(f"Generated {len(test_cases)} test cases and saved to {output_path}")
-            
-            # Record in history if requested
             if record_history:
+                self._record_history(output_path, test_data)
+        
+        return result
+    
+    def generate_batch(self, tickets: List[TestCaseData], template_path: str = "Testcases_template.xlsx",
+                       output_dir: str = "testcases", jobs: int = 4, record_history: bool = True,
+                       output_format: str = "xlsx") -> List[BatchResult]:
+        """Generate test cases for many tickets over a bounded worker pool
+
+        Each ticket is written to ``{output_dir}/{jira}_testcases.xlsx`` (or the
+        extension of output_format, see output_writers). A failure
+        on one ticket never aborts the others; results are returned in input order.
+        History entries are group-committed rather than written one per ticket.
+        """
+        output_paths = self._batch_output_paths(tickets, output_dir, output_format)
+        history = TestCaseHistory() if record_history else None
+        
+        def run(test_data: TestCaseData, output_path: str) -> BatchResult:
+            start = time.perf_counter()
+            try:
+                count = self._generate_to_file(template_path, output_path, test_data, record_history, history=history)
+                return self._batch_result(test_data, output_path, count, start)
+            except Exception as e:
+                return BatchResult(test_data.jira_ticket, False, output_path, error=str(e),
+                                   duration=time.perf_counter() - start)
+        
+        with self._history_batch(history), ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = [executor.submit(run, t, p) for t, p in zip(tickets, output_paths)]
+            return [f.result() for f in futures]
+    
+    async def agenerate_batch(self, tickets: List[TestCaseData], template_path: str = "Testcases_template.xlsx",
+                              output_dir: str = "testcases", concurrency: int = 50, record_history: bool = True,
+                              output_format: str = "xlsx") -> List[BatchResult]:
+        """Async variant of generate_batch
+
+        Keeps up to ``concurrency`` generations in flight on a single event loop
+        instead of one thread per request.
+        """
+        output_paths = self._batch_output_paths(tickets, output_dir, output_format)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        history = TestCaseHistory() if record_history else None
+        
+        async def run(test_data: TestCaseData, output_path: str) -> BatchResult:
+            async with semaphore:
+                start = time.perf_counter()
                 try:
-                    history = TestCaseHistory()
-                    provider_name = self.provider.__class__.__name__.replace('Provider', '').lower()
-                    history.add_entry(
-                        jira_ticket=test_data.jira_ticket,
-                        priority=test_data.priority,
-                        acceptance_criteria=test_data.acceptance_criteria,
-                        file_path=output_path,
-                        provider=provider_name,
-                        component=test_data.component,
-                        test_type=test_data.test_type
-                    )
-                    print(f"📝 Recorded in history: {output_path}")
+                    count = await self._agenerate_to_file(template_path, output_path, test_data, record_history, history)
+                    return self._batch_result(test_data, output_path, count, start)
                 except Exception as e:
-                    print(f"⚠️ Warning: Could not record history: {e}")
-            
-            return True
-            
-        except Exception as e:
-            print(f"Error generating test cases: {e}")
-            return False
+                    return BatchResult(test_data.jira_ticket, False, output_path, error=str(e),
+                                       duration=time.perf_counter() - start)
+        
+        try:
+            with self._history_batch(history):
+                return await asyncio.gather(*(run(t, p) for t, p in zip(tickets, output_paths)))
+        finally:
+            await self.aclose()
+    
+    @staticmethod
+    def _history_batch(history: Optional[TestCaseHistory]):
+        """Group-commit context for a batch run (a no-op when history isn't recorded)"""
+        return history.batch() if history else nullcontext()
+    
+    def _batch_result(self, test_data: TestCaseData, output_path: str, count: int, start: float) -> BatchResult:
+        """Successful batch result, including how the test cases were produced"""
+        info = self.last_generation_info or GenerationInfo()
+        return BatchResult(test_data.jira_ticket, True, output_path, count,
+                           duration=time.perf_counter() - start, source=info.source,
+                           similarity=info.similarity, reused_from=info.reused_from,
+                           retries=info.retries, provider=info.provider)
+    
+    def _batch_output_paths(self, tickets: List[TestCaseData], output_dir: str, output_format: str = "xlsx") -> List[str]:
+        """Output file path for each ticket in a batch"""
+        os.makedirs(output_dir, exist_ok=True)
+        extension = get_output_format(output_format).extension
+        
+        # Give repeated tickets distinct file names so workers never clobber each other
+        output_paths = []
+        seen = {}
+        for test_data in tickets:
+            count = seen.get(test_data.jira_ticket, 0) + 1
+            seen[test_data.jira_ticket] = count
+            suffix = "" if count == 1 else f"_{count}"
+            output_paths.append(os.path.join(output_dir, f"{test_data.jira_ticket}_testcases{suffix}{extension}"))
+        return output_paths
+
+def write_batch_report(results: List[BatchResult], report_path: str):
+    """Write per-ticket batch results to a CSV report"""
+    import pandas as pd
+    pd.DataFrame([r.__dict__ for r in results]).to_csv(report_path, index=False)
 
 def main():
     """Main function with command line interface"""
     parser = argparse.ArgumentParser(description="Generate test cases from JIRA ticket details")
-    parser.add_argument("--jira", required=True, help="JIRA ticket number")
-    parser.add_argument("--priority", required=True, help="Priority (High, Medium, Low)")
-    parser.add_argument("--criteria", required=True, help="Acceptance criteria")
-    parser.add_argument("--provider", default="groq", help="AI provider (groq, ollama, gemini)")
+    parser.add_argument("--jira", help="JIRA ticket number")
+    parser.add_argument("--priority", help="Priority (High, Medium, Low)")
+    parser.add_argument("--criteria", help="Acceptance criteria")
+    parser.add_argument("--batch", help="CSV/XLSX file of tickets (columns: jira, priority, criteria, optional component, release, test_type)")
+    parser.add_argument("--jobs", type=int, default=4, help="Number of concurrent workers for --batch")
+    parser.add_argument("--output-dir", default="testcases", help="Output directory for --batch")
+    parser.add_argument("--report", help="Batch report CSV path (default: <output-dir>/batch_report.csv)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run --batch on a single asyncio event loop (--jobs sets requests in flight)")
+    parser.add_argument("--provider", default="groq", help="AI provider (groq, ollama, gemini), or auto / a comma-separated list to route between providers")
     parser.add_argument("--template", default="Testcases_template.xlsx", help="Template file path")
     parser.add_argument("--output", help="Output file path")
+    parser.add_argument("--format", choices=list(OUTPUT_FORMATS), help="Output format (default xlsx, or the --output file extension); parquet and arrow need pyarrow")
     parser.add_argument("--component", default="Web Application", help="Component name")
     parser.add_argument("--release", default="1.0", help="Release version")
     parser.add_argument("--test-type", default="Functional", help="Test type")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the response cache and always call the provider (also disables --reuse-threshold)")
+    parser.add_argument("--temperature", type=float, help="Sampling temperature (provider default if omitted)")
+    parser.add_argument("--seed", type=int, help="Sampling seed for repeatable output (Groq, Ollama)")
+    parser.add_argument("--reuse-threshold", type=float, help="Reuse test cases from a past ticket whose criteria are at least this similar (0-1, e.g. 0.85); ignored with --no-cache")
+    parser.add_argument("--hedge", metavar="PROVIDER", help="Also send the request to PROVIDER if the primary is slower than usual; the first valid answer wins")
+    parser.add_argument("--hedge-percentile", type=float, help="Primary latency percentile after which --hedge fires (default 95)")
+    parser.add_argument("--split-criteria", action="store_true", help="Split long acceptance criteria into sections, generate them in parallel and merge the results")
+    parser.add_argument("--structured", action="store_true", help="Request schema-constrained JSON, validate each test case and repair only the invalid ones")
+    parser.add_argument("--deterministic", action="store_true", help="Use temperature 0 and a fixed seed so cached results are reproducible")
+    parser.add_argument("--consolidate", metavar="OUTPUT", help="Merge the latest generated file of every ticket in history into OUTPUT (--jobs files read in parallel)")
+    parser.add_argument("--by-component", action="store_true", help="With --consolidate, write one sheet per component instead of a single deduplicated sheet")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="With --consolidate, only tickets generated on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="With --consolidate, only tickets generated before this date (YYYY-MM-DD)")
     
     args = parser.parse_args()
     
+    if args.deterministic:
+        args.temperature = 0.0 if args.temperature is None else args.temperature
+        args.seed = DETERMINISTIC_SEED if args.seed is None else args.seed
+    
+    if args.consolidate:
+        run_consolidate(args)
+        return
+    
+    if args.batch:
+        run_batch(args)
+        return
+    
+    if not (args.jira and args.priority and args.criteria):
+        parser.error("--jira, --priority and --criteria are required unless --batch is given")
+    if args.output and args.format and format_for_path(args.output, default=args.format).name != args.format:
+        parser.error(f"--output {args.output} doesn't match --format {args.format}")
+    
     # Set output file name if not provided
     if not args.output:
         # Create testcases directory if it doesn't exist
         testcases_dir = "testcases"
         os.makedirs(testcases_dir, exist_ok=True)
-        args.output = os.path.join(testcases_dir, f"{args.jira}_testcases.xlsx")
+        extension = get_output_format(args.format or "xlsx").extension
+        args.output = os.path.join(testcases_dir, f"{args.jira}_testcases{extension}")
     
     # Create test data object
     test_data = TestCaseData(
@@ -495,8 +2109,14 @@ def main():
     )
     
     # Generate test cases
-    generator = TestCaseGenerator(args.provider)
+    generator = create_generator(args)
     success = generator.generate_from_template(args.template, args.output, test_data)
+    print_cache_stats(generator)
+    info = generator.last_generation_info
+    if info and info.retries:
+        print(f"🔁 {info.retries} provider calls were retried")
+    if info and info.continuations:
+        print(f"✂️ {info.continuations} continuation request(s) completed a truncated response")
     
     if success:
         print(f"\n✅ Test cases successfully generated!")
@@ -505,5 +2125,83 @@ def main():
         print("\n❌ Failed to generate test cases")
         sys.exit(1)
 
+def create_generator(args) -> TestCaseGenerator:
+    """Create a generator from parsed command line arguments"""
+    return TestCaseGenerator(args.provider, use_cache=not args.no_cache,
+                             temperature=args.temperature, seed=args.seed,
+                             reuse_threshold=args.reuse_threshold, hedge_provider=args.hedge,
+                             hedge_percentile=args.hedge_percentile,
+                             split_criteria=args.split_criteria or None,
+                             structured_output=args.structured or None)
+
+def print_cache_stats(generator: TestCaseGenerator):
+    """Print response cache hit/miss counters for this run"""
+    stats = generator.cache.get_stats()
+    print(f"♻️ Response cache: {stats['hits']} hits, {stats['misses']} misses "
+          f"({stats['entries']} entries, lifetime hit rate {stats['hit_rate']:.0%})")
+
+def run_consolidate(args):
+    """Build a consolidated release export from history"""
+    from consolidate import consolidate
+    print(f"📚 Consolidating the latest generation of each ticket into {args.consolidate}...")
+    start = time.perf_counter()
+    try:
+        result = consolidate(args.consolidate, by_component=args.by_component, date_from=args.since,
+                             date_to=args.until, jobs=args.jobs, format_name=args.format)
+    except (ValueError, RuntimeError, ImportError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    for skipped in result.skipped:
+        print(f"   ⚠️ Skipped {skipped}")
+    duplicate_note = f", {result.duplicates} duplicate rows dropped" if result.duplicates else ""
+    print(f"✅ {result.rows} rows from {result.tickets} tickets in {time.perf_counter() - start:.1f}s{duplicate_note}")
+    print(f"📁 Output file: {result.output_path}")
+
+def run_batch(args):
+    """Run batch generation from the command line"""
+    tickets = load_tickets(args.batch, args.component, args.release, args.test_type)
+    if not tickets:
+        print(f"❌ No tickets found in {args.batch}")
+        sys.exit(1)
+    
+    print(f"🚀 Generating test cases for {len(tickets)} tickets with {args.jobs} workers...")
+    generator = create_generator(args)
+    start = time.perf_counter()
+    if args.use_async:
+        results = asyncio.run(generator.agenerate_batch(tickets, args.template, args.output_dir, args.jobs,
+                                                        output_format=args.format or "xlsx"))
+    else:
+        results = generator.generate_batch(tickets, args.template, args.output_dir, args.jobs,
+                                           output_format=args.format or "xlsx")
+    elapsed = time.perf_counter() - start
+    
+    report_path = args.report or os.path.join(args.output_dir, "batch_report.csv")
+    write_batch_report(results, report_path)
+    
+    print("\n📊 Batch Results:")
+    for r in results:
+        if r.success:
+            reuse_note = f", reused from {r.reused_from} at {r.similarity:.2f}" if r.reused_from else ""
+            retry_note = f", {r.retries} retries" if r.retries else ""
+            fallback_note = ", fallback only" if r.source == "fallback" else ""
+            print(f"   ✅ {r.jira_ticket}: {r.test_case_count} test cases -> {r.output_path} ({r.duration:.1f}s{reuse_note}{retry_note}{fallback_note})")
+        else:
+            print(f"   ❌ {r.jira_ticket}: {r.error}")
+    
+    failed = [r for r in results if not r.success]
+    print(f"\n🎯 {len(results) - len(failed)}/{len(results)} tickets succeeded in {elapsed:.1f}s")
+    routed = Counter(r.provider for r in results if r.success and r.source == "provider")
+    if len(routed) > 1:
+        print("🔀 Routed: " + ", ".join(f"{count} via {name}" for name, count in routed.most_common()))
+    retries = sum(r.retries for r in results)
+    if retries:
+        print(f"🔁 {retries} provider calls were retried")
+    print(f"📄 Report: {report_path}")
+    print_cache_stats(generator)
+    
+    if failed:
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
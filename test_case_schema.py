@@ -0,0 +1,79 @@
+import json
+from typing import Any, List
+
+# Fields the model returns for each test case, with their descriptions
+TEST_CASE_FIELDS = {
+    "title": "Test case title",
+    "preconditions": "Prerequisites for the test",
+    "test_steps": "Step-by-step instructions",
+    "data_for_steps": "Test data needed",
+    "expected_results": "Expected outcome",
+    "tags": "Relevant tags",
+}
+
+# A test case without these can't be executed
+REQUIRED_FIELDS = ("title", "test_steps", "expected_results")
+
+# JSON schema of one test case. Only keywords every provider understands are
+# used (Gemini's response_schema rejects most others).
+TEST_CASE_SCHEMA = {
+    "type": "object",
+    "properties": {name: {"type": "string", "description": description}
+                   for name, description in TEST_CASE_FIELDS.items()},
+    "required": list(TEST_CASE_FIELDS),
+}
+
+# Structured responses wrap the array in an object, since JSON modes such as
+# Groq's only accept an object at the top level
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {"test_cases": {"type": "array", "items": TEST_CASE_SCHEMA}},
+    "required": ["test_cases"],
+}
+
+STRUCTURED_OUTPUT_INSTRUCTIONS = """
+Respond with a JSON object of the form {"test_cases": [...]} where each element
+has exactly the fields above, all as strings.
+"""
+
+def normalize_test_case(item: Any) -> Any:
+    """Join list values (e.g. test_steps as an array of steps) into newline-separated strings"""
+    if not isinstance(item, dict):
+        return item
+    return {name: "\n".join(str(v) for v in value) if isinstance(value, list) else value
+            for name, value in item.items()}
+
+def validate_test_case(item: Any) -> List[str]:
+    """Problems that make item unusable as a test case; empty if it is valid"""
+    if not isinstance(item, dict):
+        return [f"expected an object, got {type(item).__name__}"]
+    problems = []
+    for name in REQUIRED_FIELDS:
+        value = item.get(name)
+        if not isinstance(value, str) or not value.strip():
+            problems.append(f'"{name}" is missing or empty')
+    for name in TEST_CASE_FIELDS:
+        value = item.get(name)
+        if name not in REQUIRED_FIELDS and value is not None and not isinstance(value, str):
+            problems.append(f'"{name}" must be a string')
+    return problems
+
+def repair_prompt(invalid: List[Any], problems: List[List[str]], jira_ticket: str,
+                  acceptance_criteria: str) -> str:
+    """Prompt asking the model to fix only the test cases that failed validation"""
+    listed = "\n".join(f"Test case {i}: {'; '.join(p)}" for i, p in enumerate(problems, 1))
+    return f"""
+The following test cases for JIRA ticket {jira_ticket} do not match the required format.
+
+Acceptance Criteria: {acceptance_criteria}
+
+Problems:
+{listed}
+
+Test cases:
+{json.dumps(invalid, indent=2, ensure_ascii=False, default=str)}
+
+Return a JSON object of the form {{"test_cases": [...]}} with exactly {len(invalid)} corrected
+test cases in the same order. Each must have the fields {", ".join(TEST_CASE_FIELDS)},
+all as non-empty strings. Return ONLY the JSON object.
+"""